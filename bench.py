@@ -0,0 +1,122 @@
+"""Headless end-to-end frame benchmark
+
+    python bench.py [--level dev] [--frames 5000] [--out bench.json]
+
+Boots `Game` on the dummy SDL video driver, drives scripted inputs into the
+player with no vsync and no frame cap, and prints frame time percentiles and
+per-phase timings as JSON so runs can be diffed between commits.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import numpy as np
+
+from src.main import Game
+from src.input import ScriptedInput
+from src.simulation import walk_and_jump
+
+PHASES = (
+    "handle_events",
+    "update",
+    "fixed_update",
+    "level_draw",
+    "present",
+    "deferred",
+    "hud_draw",
+    "flip",
+)
+
+
+def summarize(samples: np.ndarray) -> dict:
+    ms = samples * 1e3
+    return {
+        "mean": float(ms.mean()),
+        "p50": float(np.percentile(ms, 50)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+        "max": float(ms.max()),
+    }
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(level: str, frames: int, warmup: int) -> dict:
+    game = Game(level=level)
+    game.input = ScriptedInput(walk_and_jump)
+    game.target_fps = 0  # no clock.tick cap
+
+    timings = np.zeros((warmup + frames, len(PHASES)))
+    steps = (
+        game.handle_events,
+        lambda: (game.update_dt(), game.update()),
+        game.step,
+        game.draw_world,
+        game.present,
+        game.run_deferred,
+        game.draw_hud,
+        game.flip,
+    )
+
+    game.prev_time = time.perf_counter()
+    for frame in range(warmup + frames):
+        game.scheduler.begin_frame(game.target_fps)
+        row = timings[frame]
+        for phase, step in enumerate(steps):
+            start = time.perf_counter()
+            step()
+            row[phase] = time.perf_counter() - start
+
+    timings = timings[warmup:]
+    return {
+        "commit": commit(),
+        "level": level,
+        "frames": frames,
+        "frame_ms": summarize(timings.sum(axis=1)),
+        "phases_ms": {
+            phase: summarize(timings[:, i]) for i, phase in enumerate(PHASES)
+        },
+        "player": {
+            "x": game.level.player.hit_rect.x,
+            "y": game.level.player.hit_rect.y,
+            "score": game.level.player.score,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--level", default="dev")
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.level, args.frames, args.warmup)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
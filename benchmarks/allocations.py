@@ -0,0 +1,110 @@
+"""Steady-state allocations per frame against entity count
+
+Run from the repository root:
+
+    python -m benchmarks.allocations [--frames 300] [--counts 100 10000 100000]
+
+Runs full headless `Game` frames with `--counts` collectibles scattered
+around the player and measures, under `tracemalloc`, the peak memory
+allocated within each frame above what was live before it and what is
+still live after it. Exits non-zero when the mean per-frame peak goes over
+`--limit-kb` or the largest count allocates more than `--growth` times the
+smallest, both of which mean something in the hot path allocates per entity.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.settings import *
+from src.main import Game
+from src.input import InputState, ScriptedInput
+
+
+def walk(frame: int) -> InputState:
+    right = frame // 120 % 2 == 0
+    return InputState(left=not right, right=right, jump=frame % 90 == 0)
+
+
+def build_game(count: int) -> Game:
+    game = Game()
+    game.input = ScriptedInput(walk)
+    game.target_fps = 0
+
+    # coins around the spawn, out of reach of the walking player
+    rng = np.random.default_rng(0)
+    coin = pg.Surface((8, 8))
+    x, y = game.level.player.hit_rect.center
+    store = game.level.collectibles
+    for cx, cy in rng.uniform((-2000, -4000), (2000, -400), (count, 2)).tolist():
+        store.add(x + cx, y + cy, coin, 1, phase=cx)
+    return game
+
+
+def frame(game: Game):
+    game.scheduler.begin_frame(game.target_fps)
+    game.handle_events()
+    game.update_dt()
+    game.update()
+    game.step()
+    game.draw()
+
+
+def measure(game: Game, frames: int, warmup: int) -> tuple[np.ndarray, np.ndarray]:
+    game.prev_time = time.perf_counter()
+    for _ in range(warmup):
+        frame(game)
+
+    peaks = np.zeros(frames)
+    growth = np.zeros(frames)
+    tracemalloc.start()
+    for i in range(frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame(game)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks[i] = peak - before
+        growth[i] = current - before
+    tracemalloc.stop()
+    return peaks, growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--limit-kb", type=float, default=16)
+    parser.add_argument("--growth", type=float, default=2)
+    args = parser.parse_args()
+
+    print(f"{'entities':>10} {'peak (KB)':>10} {'p99 (KB)':>9} {'kept (B)':>9}")
+    means = []
+    for count in args.counts:
+        peaks, growth = measure(build_game(count), args.frames, args.warmup)
+        means.append(peaks.mean() / 1024)
+        print(
+            f"{count:>10} {means[-1]:>10.1f} {np.percentile(peaks, 99) / 1024:>9.1f}"
+            f" {growth.mean():>9.0f}"
+        )
+        pg.display.quit()
+
+    failures = []
+    if max(means) > args.limit_kb:
+        failures.append(f"over {args.limit_kb:.0f} KB per frame")
+    if means[-1] > max(means[0], 1) * args.growth:
+        failures.append(f"grows {means[-1] / max(means[0], 1):.1f}x with entity count")
+    if failures:
+        print(f"\nfailed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Implementations the game has replaced, kept for the benchmarks to compare against"""
+
+from src.settings import *
+from src.sprite import Sprite
+from src.utils import apply_scroll
+
+
+class SpatialHash:
+    """Uniform grid broadphase
+
+    Objects are bucketed into every `cell_size` cell their rect overlaps, so a
+    query only touches the buckets under the queried rect instead of every
+    object in the level.
+    """
+
+    def __init__(self, cell_size: int = TILE_SIZE) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list] = {}
+        self.bounds: dict[object, tuple[int, int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __contains__(self, obj: object) -> bool:
+        return obj in self.bounds
+
+    def cell_range(self, rect: pg.Rect | pg.FRect) -> tuple[int, int, int, int]:
+        size = self.cell_size
+        # right / bottom edges are exclusive, matching `colliderect`
+        return (
+            int(rect.left // size),
+            int(rect.top // size),
+            int(-(-rect.right // size)) - 1,
+            int(-(-rect.bottom // size)) - 1,
+        )
+
+    def insert(self, obj: object, rect: pg.Rect | pg.FRect):
+        if obj in self.bounds:
+            self.remove(obj)
+
+        bounds = self.cell_range(rect)
+        left, top, right, bottom = bounds
+        for cy in range(top, bottom + 1):
+            for cx in range(left, right + 1):
+                self.cells.setdefault((cx, cy), []).append(obj)
+        self.bounds[obj] = bounds
+
+    def remove(self, obj: object):
+        bounds = self.bounds.pop(obj, None)
+        if bounds is None:
+            return
+
+        left, top, right, bottom = bounds
+        for cy in range(top, bottom + 1):
+            for cx in range(left, right + 1):
+                cell = self.cells[(cx, cy)]
+                cell.remove(obj)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def move(self, obj: object, rect: pg.Rect | pg.FRect):
+        """Re-bucket a dynamic object, cheap when it stays in the same cells"""
+        if self.bounds.get(obj) == self.cell_range(rect):
+            return
+        self.insert(obj, rect)
+
+    def query(self, rect: pg.Rect | pg.FRect) -> list:
+        """Objects whose cells overlap `rect`, without duplicates
+
+        Candidates still need a narrowphase (`colliderect`) check.
+        """
+        left, top, right, bottom = self.cell_range(rect)
+        cells = self.cells
+        found = {}
+        for cy in range(top, bottom + 1):
+            for cx in range(left, right + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(dict.fromkeys(cell))
+
+        return list(found)
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
+
+
+class Wall(Sprite):
+    """A sprite per wall tile, what levels were built from before `TileLayer`"""
+
+    def __init__(self, x: float, y: float, surf: pg.Surface) -> None:
+        super().__init__(vector(x, y), surf)
+        self.rect = self.image.get_rect()
+        self.rect.x = x * self.rect.w
+        self.rect.y = y * self.rect.h
+        self.old_rect = self.rect.copy()
+
+    def update(self):
+        self.old_rect = self.rect.copy()
+
+    def draw(self, target: pg.Surface, scroll: vector):
+        target.blit(self.image, apply_scroll(self.rect, scroll))
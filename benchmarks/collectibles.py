@@ -0,0 +1,87 @@
+"""Per-frame collectible cost against collectible count
+
+Run from the repository root:
+
+    python -m benchmarks.collectibles [--frames 500] [--counts 1000 100000]
+
+Scatters coins over a square map and times the pickup test against a
+player-sized rect plus drawing them into the 320x180 target, the work
+`Level` does for collectibles every frame. "pixel" is the same pickup test
+with the player's mask, as with `settings["physics"]["pixel_perfect"]`.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from src.settings import *
+from src.entities import EntityStore
+
+
+def build_store(count: int, coin: pg.Surface, rng: np.random.Generator) -> EntityStore:
+    side = int((count * 4) ** 0.5) * TILE_SIZE  # about one coin every four tiles
+    store = EntityStore(count)
+    for x, y in rng.integers(0, side, (count, 2)).tolist():
+        store.add(x, y, coin, 5, phase=x * 0.05)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    target = pg.Surface(display_size)
+    coin = pg.Surface((18, 18), pg.SRCALPHA)
+    pg.draw.circle(coin, (255, 200, 0), (9, 9), 8)
+    player_mask = pg.mask.from_surface(
+        pg.image.load("assets/player/idle.png").subsurface(0, 0, 32, 32)
+    )
+    rng = np.random.default_rng(0)
+
+    budget = 1000 / settings["display"]["target_fps"]
+    print(
+        f"{'coins':>10} {'collect (us)':>13} {'pixel (us)':>11}"
+        f" {'draw (us)':>10} {'budget %':>9}"
+    )
+    for count in args.counts:
+        store = build_store(count, coin, rng)
+        pixel_store = build_store(count, coin, rng)
+        player = pg.FRect(0, 0, 20, 24)
+
+        collect = pixel = draw = 0
+        for frame in range(args.frames):
+            player.center = (frame * 3.1 % 2000, frame * 1.7 % 2000)
+            scroll = vector(player.centerx - 160, player.centery - 90)
+
+            start = time.perf_counter()
+            store.collect(player)
+            collect += time.perf_counter() - start
+
+            start = time.perf_counter()
+            pixel_store.collect(player.inflate(12, 8), player_mask)
+            pixel += time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.draw(target, scroll, frame / 165)
+            draw += time.perf_counter() - start
+
+        collect, draw = collect / args.frames * 1e3, draw / args.frames * 1e3
+        pixel = pixel / args.frames * 1e3
+        print(
+            f"{count:>10} {collect * 1e3:>13.1f} {pixel * 1e3:>11.1f}"
+            f" {draw * 1e3:>10.1f} {(collect + draw) / budget * 100:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Per-tick collision cost against map size
+
+Run from the repository root:
+
+    python -m benchmarks.collision [--frames 2000] [--sizes 1000 1000000]
+
+"grid" is the occupancy grid resolver `Player.fixed_update` uses and should
+stay flat as the wall count grows. "scan" tests the hit rect against every
+wall rect, as the per-wall collision used to, and grows linearly.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from src.settings import *
+from src.collision import TileGrid
+from src.entities import EntityStore
+from src.player import Player
+from src.simulation import Simulation
+from src.levels.level import Level
+
+
+def build_level(wall_count: int) -> Level:
+    """Stack of one tile thick floors, four tiles apart, `wall_count` tiles total
+
+    Swapped into the dev level as `Simulation` builds it, with no collectibles.
+    """
+    width = max(int((wall_count * 4) ** 0.5), 8)
+    floors = -(-wall_count // width)
+    solid = np.zeros((floors * 4, width), np.uint8)
+    solid[3::4] = 1
+    solid.reshape(-1)[np.flatnonzero(solid)[wall_count:]] = 0
+
+    level = Simulation("dev").level
+    level.collectibles = EntityStore()
+    level.tile_grid = TileGrid(solid, TILE_SIZE)
+
+    # spawn in the middle of the map, just above a floor
+    level.player = Player(
+        level, width // 2 * TILE_SIZE, (floors // 2 * 4 + 1) * TILE_SIZE
+    )
+    return level
+
+
+def wall_rects(grid: TileGrid) -> list[pg.Rect]:
+    size = grid.tile_size
+    return [
+        pg.Rect(x * size, y * size, size, size) for y, x in zip(*np.nonzero(grid.solid))
+    ]
+
+
+def run_frames(level: Level, frames: int, walls: list[pg.Rect] | None) -> float:
+    player = level.player
+    start = time.perf_counter()
+    for frame in range(frames):
+        level.game.sim_time = frame / 165
+        player.velocity.x = 1 if frame // 200 % 2 else -1
+        player.jump = frame % 90 == 0
+        if walls is not None:
+            player.old_rect = player.hit_rect.copy()
+            player.move(1 / 165)
+            player.hit_rect.collidelistall(walls)
+        else:
+            player.fixed_update(1 / 165, level.tile_grid, level.collectibles)
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--scan-max",
+        type=int,
+        default=100_000,
+        help="skip the full scan above this many walls",
+    )
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+
+    print(f"{'walls':>10} {'build (s)':>10} {'grid (us)':>10} {'scan (us)':>10}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        level = build_level(size)
+        build = time.perf_counter() - start
+
+        spawn = level.player.hit_rect.copy()
+        grid = run_frames(level, args.frames, None)
+
+        scan = "-"
+        if size <= args.scan_max:
+            level.player.hit_rect = spawn
+            walls = wall_rects(level.tile_grid)
+            scan = f"{run_frames(level, args.frames, walls) * 1e6:.1f}"
+
+        print(f"{size:>10} {build:>10.2f} {grid * 1e6:>10.1f} {scan:>10}")
+
+
+if __name__ == "__main__":
+    main()
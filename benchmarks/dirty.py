@@ -0,0 +1,96 @@
+"""Frame cost of the dirty-rect renderer against full redraws
+
+Run from the repository root:
+
+    python -m benchmarks.dirty [--frames 1000] [--scene idle walk]
+
+Runs headless `Game` frames with and without `DirtyRenderer` and times
+drawing, presenting and flipping. "idle" leaves the player standing so the
+camera settles and only the player, coins and particles change, "walk"
+keeps the camera moving, so dirty mode redraws in full on every frame the
+view moves by a pixel. Also reports the share of frames drawn in part
+and the mean window area updated. Run it on the real video driver for
+on-screen numbers, the dummy driver only measures the CPU side.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.settings import *
+from src.main import Game
+from src.input import InputState, ScriptedInput
+from src.simulation import walk_and_jump
+
+SCENES = {
+    "idle": lambda frame: InputState(),
+    "walk": walk_and_jump,
+}
+
+
+def run(
+    scene: str, dirty: bool, frames: int, warmup: int
+) -> tuple[np.ndarray, np.ndarray, Game]:
+    game = Game(dirty=dirty)
+    game.input = ScriptedInput(SCENES[scene])
+    game.target_fps = 0
+    window = game.window_size[0] * game.window_size[1]
+
+    timings = np.zeros(frames)
+    area = np.zeros(frames)
+    game.prev_time = time.perf_counter()
+    for frame in range(-warmup, frames):
+        game.scheduler.begin_frame(game.target_fps)
+        game.handle_events()
+        game.update_dt()
+        game.update()
+        game.step()
+
+        start = time.perf_counter()
+        game.draw()
+        if frame >= 0:
+            timings[frame] = time.perf_counter() - start
+            presented = game.presented
+            area[frame] = (
+                1 if presented is None else sum(r.w * r.h for r in presented) / window
+            )
+
+    pg.display.quit()
+    return timings, area, game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=300)
+    parser.add_argument("--scene", nargs="+", default=list(SCENES), choices=SCENES)
+    args = parser.parse_args()
+
+    print(f"driver: {os.environ['SDL_VIDEODRIVER']}")
+    print(
+        f"{'scene':>6} {'mode':>6} {'mean (ms)':>10} {'p50':>8} {'p99':>8}"
+        f" {'partial':>8} {'updated':>8}"
+    )
+    for scene in args.scene:
+        for dirty in (False, True):
+            timings, area, game = run(scene, dirty, args.frames, args.warmup)
+            ms = timings * 1e3
+            partial = 0
+            if dirty:
+                partial = game.dirty.partial_frames / (
+                    game.dirty.partial_frames + game.dirty.full_frames
+                )
+            print(
+                f"{scene:>6} {'dirty' if dirty else 'full':>6} {ms.mean():>10.3f}"
+                f" {np.percentile(ms, 50):>8.3f} {np.percentile(ms, 99):>8.3f}"
+                f" {partial:>8.0%} {area.mean():>8.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Time from process start to the first presented frame, with a budget
+
+Run from the repository root:
+
+    python -m benchmarks.first_frame [--runs 5] [--budget-ms 500]
+        [--import-budget-ms 350]
+
+Each run starts a fresh interpreter under `-X importtime`, builds `Game` on
+the dummy video driver and presents one frame. Reports the median time to
+that frame, the median import time of `src.main` and the slowest modules of
+the last run, and exits non-zero when either median is over its budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+
+from src.assets import assets
+
+game = src.main.Game()
+built = time.perf_counter()
+game.prev_time = time.perf_counter()
+game.handle_events()
+game.update_dt()
+game.update()
+game.step()
+game.draw()
+print(json.dumps({
+    "wall": time.time(),
+    "import": imported - start,
+    "game": built - imported,
+    "frame": time.perf_counter() - built,
+    "pending": sum(not f.done() for f in assets.pending.values()),
+}))
+"""
+
+
+def run_once() -> tuple[dict, list[tuple[int, str]]]:
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["first_frame"] = result["wall"] - start
+
+    # "import time: self [us] | cumulative | name"
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append((int(cumulative), name.rstrip()))
+    return result, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500)
+    parser.add_argument("--import-budget-ms", type=float, default=350)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports listed")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        result, modules = run_once()
+        runs.append(result)
+
+    def median(key: str) -> float:
+        return statistics.median(run[key] for run in runs) * 1e3
+
+    print(
+        f"{'first frame':>16} {median('first_frame'):>8.1f} ms"
+        f"  (budget {args.budget_ms:.0f})"
+    )
+    print(
+        f"{'import src.main':>16} {median('import'):>8.1f} ms"
+        f"  (budget {args.import_budget_ms:.0f})"
+    )
+    print(f"{'Game()':>16} {median('game'):>8.1f} ms")
+    print(f"{'first draw':>16} {median('frame'):>8.1f} ms")
+    print(f"{'still loading':>16} {runs[-1]['pending']:>8} assets")
+
+    print()
+    print(f"{'cumulative (ms)':>16}  module")
+    for cumulative, name in sorted(modules, reverse=True)[: args.top]:
+        print(f"{cumulative / 1e3:>16.1f} {name}")
+
+    over = []
+    if median("first_frame") > args.budget_ms:
+        over.append("first frame")
+    if median("import") > args.import_budget_ms:
+        over.append("import")
+    if over:
+        print(f"\nover budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Hud memory and redraw time over a long simulated session
+
+Run from the repository root:
+
+    python -m benchmarks.hud [--minutes 60]
+
+Drives `Hud.update` at its 100 ms refresh rate with changing debug values
+for the simulated duration, without waiting in real time. Fails if the
+number of debug lines, the traced memory or the redraw time grows between
+the first and the last part of the session.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from src.settings import *
+from src.main import Game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--window", type=int, default=1000, help="updates compared")
+    args = parser.parse_args()
+
+    game = Game()
+    game.toggle_hud()
+    hud = game.hud
+    player = game.level.player
+
+    updates = int(args.minutes * 60 / hud.update_interval)
+    timings = np.zeros(updates)
+    memory = np.zeros(updates)
+    lines = np.zeros(updates)
+
+    tracemalloc.start()
+    for i in range(updates):
+        game.now = (i + 1) * hud.update_interval
+        # values that change on most updates, like a player moving around
+        player.hit_rect.x = i % 500
+        player.velocity.y = (i % 37) - 18
+        player.score = i // 50
+        player.update()
+
+        start = time.perf_counter()
+        hud.update(1 / 165 + (i % 7) / 1000)
+        timings[i] = time.perf_counter() - start
+        memory[i] = tracemalloc.get_traced_memory()[0]
+        lines[i] = len(hud.debug_lines)
+    tracemalloc.stop()
+
+    window = min(args.window, updates // 4)
+    head, tail = slice(window, 2 * window), slice(-window, None)
+    report = {
+        "updates": updates,
+        "lines": (lines[head].max(), lines[tail].max()),
+        "memory_kb": (memory[head].mean() / 1024, memory[tail].mean() / 1024),
+        "update_us": (np.median(timings[head]) * 1e6, np.median(timings[tail]) * 1e6),
+        "cached_surfaces": len(hud.text_cache),
+    }
+    for key, value in report.items():
+        print(f"{key:>16}: {value}")
+
+    failures = []
+    if report["lines"][1] > report["lines"][0]:
+        failures.append("debug lines keep growing")
+    if report["memory_kb"][1] > report["memory_kb"][0] * 1.1 + 64:
+        failures.append("traced memory keeps growing")
+    if report["update_us"][1] > report["update_us"][0] * 1.5:
+        failures.append("redraw time keeps growing")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Per-frame particle cost against live particle count
+
+Run from the repository root:
+
+    python -m benchmarks.particles [--frames 500] [--counts 1000 50000]
+
+Keeps each count alive by re-emitting what expired, spread over a
+screen-sized area so most particles are drawn, and times `update` plus
+`draw` into the 320x180 target against the frame budget.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from src.settings import *
+from src.particles import ParticleSystem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[1_000, 10_000, 50_000, 100_000]
+    )
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    target = pg.Surface(display_size)
+    scroll = vector(0, 0)
+    dt = 1 / settings["display"]["target_fps"]
+
+    budget = 1000 / settings["display"]["target_fps"]
+    print(f"{'particles':>10} {'update (ms)':>12} {'draw (ms)':>10} {'budget %':>9}")
+    for count in args.counts:
+        particles = ParticleSystem(count)
+        kinds = list(particles.kinds)
+
+        update = draw = 0
+        for frame in range(args.frames):
+            missing = count - len(particles)
+            if missing:
+                particles.emit(
+                    kinds[frame % len(kinds)],
+                    display_width / 2,
+                    display_height / 2,
+                    missing,
+                    speed=(10, 120),
+                    life=(0.5, 2),
+                    gravity=60,
+                    spread=80,
+                )
+
+            start = time.perf_counter()
+            particles.update(dt)
+            update += time.perf_counter() - start
+
+            start = time.perf_counter()
+            particles.draw(target, scroll)
+            draw += time.perf_counter() - start
+
+        update, draw = update / args.frames * 1e3, draw / args.frames * 1e3
+        print(
+            f"{count:>10} {update:>12.3f} {draw:>10.3f}"
+            f" {(update + draw) / budget * 100:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Per-frame presentation cost of each backend in present.py
+
+Run from the repository root:
+
+    python -m benchmarks.present [--frames 1000] [--window 1280 720] [--hud]
+
+Fills the 320x180 target with new content every frame, then times
+`present` plus `flip` for every backend on a fresh window. `--hud` also
+draws a Hud-sized panel at native resolution, as `Game.draw_hud` does when
+debug is on. Run it on the real video driver for on-screen numbers, the
+dummy driver only measures the CPU side.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from src.settings import *
+from src.present import PRESENTERS
+
+
+def run(name: str, window_size: tuple[int, int], frames: int, hud: bool) -> np.ndarray:
+    pg.display.init()
+    presenter = PRESENTERS[name](window_size, display_size)
+
+    target = pg.Surface(display_size)
+    panel = pg.Surface((280, 380))
+    panel.fill((253, 187, 109))
+
+    timings = np.zeros(frames)
+    for frame in range(frames):
+        target.fill((frame % 256, 40, 60))
+        pg.draw.circle(target, (255, 255, 255), (frame % display_width, 90), 20)
+
+        start = time.perf_counter()
+        presenter.present(target)
+        if hud:
+            presenter.overlay().blit(panel, (0, 0))
+        presenter.flip()
+        timings[frame] = time.perf_counter() - start
+
+    pg.display.quit()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--window", type=int, nargs=2, default=[1280, 720])
+    parser.add_argument("--hud", action="store_true")
+    parser.add_argument("--backends", nargs="+", default=list(PRESENTERS))
+    args = parser.parse_args()
+
+    width, height = args.window
+    print(f"driver: {os.environ['SDL_VIDEODRIVER']}, window {width}x{height}")
+    print(f"{'backend':>10} {'mean (ms)':>10} {'p50':>8} {'p99':>8}")
+    for name in args.backends:
+        ms = run(name, tuple(args.window), args.frames, args.hud)[10:] * 1e3
+        print(
+            f"{name:>10} {ms.mean():>10.3f} {np.percentile(ms, 50):>8.3f}"
+            f" {np.percentile(ms, 99):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Load time, memory and per-frame cost against generated map size
+
+Run from the repository root:
+
+    python -m benchmarks.scaling [--widths 100 300 1000 2000 3000] [--density 0.1]
+        [--collectible-ratio 0.005] [--seed 0] [--csv PATH] [--plot PATH]
+
+Generates a seeded level per width (half as tall, see `generate_level`)
+under assets/levels/generated/ and measures compiling its TMX into the
+level cache, building a `Level` from the cache (time and memory held under
+`tracemalloc`), full headless frames of a player running and jumping, and
+physics ticks alone through `Simulation`. Levels of at least
+`streaming.min_tiles` cells stream, as they would in the game.
+
+`--csv` writes the table, `--plot` draws it with matplotlib when installed.
+"""
+
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.settings import *
+from src.main import Game
+from src.input import ScriptedInput
+from src.levels.level import Level
+from src.levels.cache import compile_level
+from src.levels.generator import generate_level
+from src.simulation import Simulation, walk_and_jump
+
+COLUMNS = (
+    "cells",
+    "tiles",
+    "collectibles",
+    "streaming",
+    "compile_s",
+    "load_ms",
+    "held_mb",
+    "frame_ms",
+    "frame_p99_ms",
+    "tick_us",
+)
+
+
+def measure(name: str, frames: int, ticks: int) -> dict[str, float]:
+    start = time.perf_counter()
+    data = compile_level(name)
+    row = {
+        "compile_s": time.perf_counter() - start,
+        "cells": data.gids.size,
+        "tiles": int(np.count_nonzero(data.gids)),
+        "collectibles": len(data.collectibles),
+    }
+
+    game = Game(level=name)
+    game.input = ScriptedInput(walk_and_jump)
+    game.target_fps = 0
+    row["streaming"] = int(bool(game.level.streaming))
+
+    # second levels from the warm cache, what every launch after the first
+    # costs, timed and traced apart as tracing slows allocation down
+    for traced in (False, True):
+        gc.collect()
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        level = Level(game, name)
+        if traced:
+            row["held_mb"] = tracemalloc.get_traced_memory()[0] / 2**20
+            tracemalloc.stop()
+        else:
+            row["load_ms"] = (time.perf_counter() - start) * 1e3
+        if level.streamer:
+            level.streamer.close()
+        del level
+
+    timings = np.zeros(frames)
+    game.prev_time = time.perf_counter()
+    for frame in range(-60, frames):
+        start = time.perf_counter()
+        game.scheduler.begin_frame(game.target_fps)
+        game.handle_events()
+        game.update_dt()
+        game.update()
+        game.step()
+        game.draw()
+        if frame >= 0:
+            timings[frame] = time.perf_counter() - start
+    row["frame_ms"] = timings.mean() * 1e3
+    row["frame_p99_ms"] = np.percentile(timings, 99) * 1e3
+    if game.level.streamer:
+        game.level.streamer.close()
+    pg.display.quit()
+
+    simulation = Simulation(name)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        simulation.step(walk_and_jump(tick))
+    row["tick_us"] = (time.perf_counter() - start) / ticks * 1e6
+    return row
+
+
+def plot(rows: list[dict[str, float]], path: str):
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise SystemExit("--plot needs matplotlib, pip install matplotlib")
+
+    cells = [row["cells"] for row in rows]
+    figure, axes = plt.subplots(1, 4, figsize=(16, 4))
+    for ax, keys, label in (
+        (axes[0], ("compile_s",), "compile (s)"),
+        (axes[1], ("load_ms",), "cached load (ms)"),
+        (axes[2], ("held_mb",), "held by Level (MB)"),
+        (axes[3], ("frame_ms", "frame_p99_ms"), "frame (ms)"),
+    ):
+        for key in keys:
+            ax.plot(cells, [row[key] for row in rows], marker="o", label=key)
+        ax.set_xscale("log")
+        ax.set_xlabel("map cells")
+        ax.set_title(label)
+        if len(keys) > 1:
+            ax.legend()
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--widths", type=int, nargs="+", default=[100, 300, 1000, 2000, 3000]
+    )
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--collectible-ratio", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--csv", metavar="PATH")
+    parser.add_argument("--plot", metavar="PATH")
+    args = parser.parse_args()
+
+    print(
+        f"{'cells':>9} {'tiles':>8} {'stream':>6} {'compile (s)':>11} {'load (ms)':>10}"
+        f" {'held (MB)':>10} {'frame (ms)':>10} {'p99':>7} {'tick (us)':>10}"
+    )
+    rows = []
+    for width in args.widths:
+        height = max(width // 2, 8)
+        name = f"generated/scaling_{width}x{height}_{args.seed}"
+        generate_level(
+            name,
+            width,
+            height,
+            args.density,
+            int(width * height * args.collectible_ratio),
+            seed=args.seed,
+        )
+        row = measure(name, args.frames, args.ticks)
+        rows.append(row)
+        print(
+            f"{row['cells']:>9} {row['tiles']:>8}"
+            f" {'yes' if row['streaming'] else 'no':>6}"
+            f" {row['compile_s']:>11.2f} {row['load_ms']:>10.1f}"
+            f" {row['held_mb']:>10.1f} {row['frame_ms']:>10.3f}"
+            f" {row['frame_p99_ms']:>7.3f} {row['tick_us']:>10.1f}"
+        )
+
+    if args.csv:
+        np.savetxt(
+            args.csv,
+            [[row[key] for key in COLUMNS] for row in rows],
+            fmt="%.4f",
+            delimiter=",",
+            header=",".join(COLUMNS),
+            comments="",
+        )
+    if args.plot:
+        plot(rows, args.plot)
+
+
+if __name__ == "__main__":
+    main()
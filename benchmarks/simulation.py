@@ -0,0 +1,65 @@
+"""Headless simulation throughput against worker process count
+
+Run from the repository root:
+
+    python -m benchmarks.simulation [--levels dev] [--jobs 16] [--ticks 20000]
+
+Runs `--jobs` input scripts per level through `run_jobs` once per worker
+count and reports simulated ticks per wall second, then the per-job results
+of the last run: collectibles picked up and the longest stretch the player
+pushed against something without moving.
+"""
+
+import argparse
+import os
+import time
+
+from src.settings import *
+from src.simulation import Job, RandomInput, idle, run_jobs, walk_and_jump
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", nargs="+", default=["dev"])
+    parser.add_argument("--jobs", type=int, default=16, help="scripts per level")
+    parser.add_argument("--ticks", type=int, default=20_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1})
+    )
+    args = parser.parse_args()
+
+    scripts = [idle, walk_and_jump] + [
+        RandomInput(seed) for seed in range(args.jobs - 2)
+    ]
+    jobs = [
+        Job(level, script, args.ticks)
+        for level in args.levels
+        for script in scripts[: args.jobs]
+    ]
+    total = len(jobs) * args.ticks
+
+    print(f"{'workers':>8} {'seconds':>8} {'ticks/s':>10} {'speedup':>8}")
+    base = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = run_jobs(jobs, workers)
+        seconds = time.perf_counter() - start
+        base = base or seconds
+        print(
+            f"{workers:>8} {seconds:>8.2f} {total / seconds:>10.0f}"
+            f" {base / seconds:>7.2f}x"
+        )
+
+    print()
+    print(
+        f"{'level':>10} {'script':>14} {'x':>8} {'y':>8} {'collected':>10} {'stuck':>6}"
+    )
+    for r in results:
+        print(
+            f"{r.level:>10} {r.script:>14} {r.x:>8.1f} {r.y:>8.1f}"
+            f" {f'{r.collected}/{r.collectibles}':>10} {r.longest_stuck:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Level snapshot and restore against reloading the level
+
+Run from the repository root:
+
+    python -m benchmarks.snapshot [--runs 10000] [--reloads 20]
+        [--collectibles 0 1000 100000]
+
+Plays a headless `Game` for a few seconds so the player has moved and
+collected something, then times `Level.snapshot`, `Level.restore` and
+building a fresh `DevLevel`, which is what a retry used to cost. `--collectibles`
+scatters extra coins around the spawn, as snapshots copy the live ones.
+Exits non-zero when a restored level doesn't snapshot back to the same state.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.settings import *
+from src.main import Game
+from src.levels.dev_level import DevLevel
+from src.input import ScriptedInput
+from src.simulation import walk_and_jump
+
+
+def build_game(collectibles: int) -> Game:
+    game = Game()
+    game.input = ScriptedInput(walk_and_jump)
+    game.target_fps = 0
+
+    rng = np.random.default_rng(0)
+    coin = pg.Surface((8, 8))
+    x, y = game.level.player.hit_rect.center
+    for cx, cy in rng.uniform((-2000, -2000), (2000, 2000), (collectibles, 2)).tolist():
+        game.level.collectibles.add(x + cx, y + cy, coin, 1)
+
+    game.prev_time = time.perf_counter()
+    for _ in range(300):
+        game.scheduler.begin_frame(game.target_fps)
+        game.handle_events()
+        game.update_dt()
+        game.update()
+        game.step()
+        game.draw()
+    return game
+
+
+def timed(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def same(a, b) -> bool:
+    return (
+        a.player == b.player
+        and a.scroll == b.scroll
+        and all(np.array_equal(x, y) for x, y in zip(a.collectibles, b.collectibles))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10_000)
+    parser.add_argument("--reloads", type=int, default=20)
+    parser.add_argument(
+        "--collectibles", type=int, nargs="+", default=[0, 1000, 100_000]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'coins':>7} {'snapshot (us)':>14} {'restore (us)':>13} {'reload (ms)':>12}"
+        f" {'speedup':>8}"
+    )
+    failed = False
+    for count in args.collectibles:
+        game = build_game(count)
+        level = game.level
+        snapshot = level.snapshot()
+
+        snap = timed(level.snapshot, args.runs)
+        restore = timed(
+            lambda level=level, snapshot=snapshot: level.restore(snapshot), args.runs
+        )
+        failed |= not same(level.snapshot(), snapshot)
+        reload = timed(lambda game=game: DevLevel(game), args.reloads)
+
+        print(
+            f"{len(level.collectibles):>7} {snap * 1e6:>14.1f} {restore * 1e6:>13.1f}"
+            f" {reload * 1e3:>12.2f} {reload / restore:>7.0f}x"
+        )
+        pg.display.quit()
+
+    if failed:
+        print("\nfailed: a restored level differs from its snapshot")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Level startup cost: TMX parsing against the compiled level cache
+
+Run from the repository root:
+
+    python -m benchmarks.startup [--level dev] [--runs 20]
+
+"tmx" is what `Level.load` used to do on every launch (`load_pygame` plus a
+`Wall` per tile), "compile" parses the TMX and writes the cache, "cached"
+memory-maps the cache and builds the walls from it.
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from pytmx.util_pygame import load_pygame
+import numpy as np
+
+from src.settings import *
+from src.levels.cache import cache_path, compile_level, level_path, load_cached
+from benchmarks.baselines import Wall
+
+
+def tmx_load(name: str):
+    map = load_pygame(level_path(name))
+    return [Wall(x, y, surf) for x, y, surf in map.get_layer_by_name("walls").tiles()]
+
+
+def cached_load(name: str):
+    data = load_cached(name)
+    return [
+        Wall(int(x), int(y), data.tile(int(data.gids[y, x])))
+        for y, x in zip(*np.nonzero(data.gids))
+    ]
+
+
+def compile_load(name: str):
+    shutil.rmtree(cache_path(name), ignore_errors=True)
+    compile_level(name)
+
+
+def measure(load, name: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        load(name)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--level", default="dev")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+
+    results = {
+        "tmx": measure(tmx_load, args.level, args.runs),
+        "compile": measure(compile_load, args.level, args.runs),
+        "cached": measure(cached_load, args.level, args.runs),
+    }
+
+    print(f"{'path':>8} {'median (ms)':>12} {'min (ms)':>10}")
+    for path, timings in results.items():
+        print(
+            f"{path:>8} {np.median(timings) * 1e3:>12.2f} {min(timings) * 1e3:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
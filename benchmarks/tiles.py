@@ -0,0 +1,124 @@
+"""Memory held by the static wall layer against tile count
+
+Run from the repository root:
+
+    python -m benchmarks.tiles [--counts 10000 100000 1000000] [--density 0.3]
+
+Builds a wall layer of each size from the dev level's tileset three ways and
+measures, under `tracemalloc`, what is still allocated once it is built:
+"wall" is what `Level.load` used to do (a `Wall` sprite per tile in a
+`SpatialHash`), "slots" a `__slots__` record of grid x, grid y and gid per
+tile, and "layer" the `TileLayer` parallel arrays. The atlas is shared by all
+three and loaded before measuring.
+"""
+
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.settings import *
+from src.tiles import TileLayer
+from src.levels.cache import LevelData, load_level_data
+from benchmarks.baselines import SpatialHash, Wall
+
+
+class SlottedTile:
+    __slots__ = ("gid", "x", "y")
+
+    def __init__(self, x: int, y: int, gid: int) -> None:
+        self.x = x
+        self.y = y
+        self.gid = gid
+
+
+def build_walls(gids: np.ndarray, data: LevelData):
+    grid = SpatialHash()
+    walls = []
+    for y, x in zip(*np.nonzero(gids)):
+        wall = Wall(int(x), int(y), data.tile(int(gids[y, x])))
+        walls.append(wall)
+        grid.insert(wall, wall.rect)
+    return walls, grid
+
+
+def build_slots(gids: np.ndarray, data: LevelData):
+    rows, columns = np.nonzero(gids)
+    return [
+        SlottedTile(x, y, gid)
+        for y, x, gid in zip(
+            rows.tolist(), columns.tolist(), gids[rows, columns].tolist()
+        )
+    ]
+
+
+def build_layer(gids: np.ndarray, data: LevelData):
+    return TileLayer(gids, data.tile_size, data.atlas_image(), data.atlas_rect)
+
+
+BUILDERS = {"wall": build_walls, "slots": build_slots, "layer": build_layer}
+
+
+def grid(count: int, density: float, data: LevelData) -> np.ndarray:
+    """A square-ish gid grid with exactly `count` tiles, using the level's gids"""
+    rng = np.random.default_rng(0)
+    side = math.ceil(math.sqrt(count / density))
+    used = np.unique(data.gids[data.gids != 0])
+    gids = np.zeros(side * side, np.int32)
+    cells = rng.choice(side * side, count, replace=False)
+    gids[cells] = rng.choice(used, count)
+    return gids.reshape(side, side)
+
+
+def measure(build, gids: np.ndarray, data: LevelData) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    layer = build(gids, data)
+    seconds = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del layer
+    return held, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument(
+        "--builders", nargs="+", default=list(BUILDERS), choices=BUILDERS
+    )
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    data = load_level_data("dev")
+    data.atlas_image()
+    for gid in np.unique(data.gids[data.gids != 0]).tolist():
+        data.tile(gid)
+
+    print(
+        f"{'tiles':>9} {'layout':>6} {'held (MB)':>10} {'B/tile':>7} {'build (s)':>10}"
+    )
+    for count in args.counts:
+        gids = grid(count, args.density, data)
+        for name in args.builders:
+            held, seconds = measure(BUILDERS[name], gids, data)
+            print(
+                f"{count:>9} {name:>6} {held / 2**20:>10.1f} {held / count:>7.1f}"
+                f" {seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
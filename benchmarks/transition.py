@@ -0,0 +1,147 @@
+"""Frame times across a level transition, with a p99 budget
+
+Run from the repository root:
+
+    python -m benchmarks.transition [--size 1000 500] [--fps 165]
+        [--budget-ms 6.06] [--warm]
+
+Plays the dev level headless at `--fps`, then moves to a generated level of
+`--size` tiles twice: once with `SceneManager.goto`, preloading on the
+workers and building in per-frame slices, and once building it on the spot
+the way `Game.__init__` used to. The level cache is deleted first unless
+`--warm`, so the TMX is parsed during the transition. Frame time is the work
+of a frame, without the frame cap's sleep.
+
+The "playing" row is the same number of frames on the dev level with no
+transition. The `goto` call is timed as part of the frame it is made in.
+Exits non-zero when the p99 over the preloaded transition is over
+`--budget-ms`.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.settings import *
+from src.main import Game
+from src.assets import assets
+from src.input import ScriptedInput
+from src.levels.cache import cache_path
+from src.levels.generator import generate_level
+from src.simulation import walk_and_jump
+
+
+def frame(game: Game, fps: float, action=None) -> float:
+    """One frame's work, `action` runs inside it like an event handler"""
+    start = time.perf_counter()
+    game.scheduler.begin_frame(fps)
+    game.handle_events()
+    if action is not None:
+        action()
+    game.update_dt()
+    game.update()
+    game.step()
+    game.draw_world()
+    game.present()
+    game.run_deferred()
+    game.draw_hud()
+    game.presenter.flip(game.presented)
+    work = time.perf_counter() - start
+    # the frame cap, outside the measured work, as the workers run in it
+    time.sleep(max(1 / fps - work, 0))
+    return work
+
+
+def run(
+    target: str,
+    fps: float,
+    staged: bool | None,
+    warm: bool,
+    before: int,
+    after: int,
+    frames: int = 0,
+) -> np.ndarray:
+    if not warm:
+        shutil.rmtree(cache_path(target), ignore_errors=True)
+    game = Game()
+    game.input = ScriptedInput(walk_and_jump)
+    game.target_fps = 0
+
+    game.prev_time = time.perf_counter()
+    for _ in range(before):
+        frame(game, fps)
+
+    timings = []
+    if staged is None:
+        for _ in range(frames):
+            timings.append(frame(game, fps))
+    elif staged:
+        timings.append(frame(game, fps, lambda: game.scenes.goto(target)))
+        while game.level.name != target:
+            timings.append(frame(game, fps))
+    else:
+        start = time.perf_counter()
+        game.scenes.activate(game.scenes.create(target))
+        timings.append(time.perf_counter() - start)
+    for _ in range(after):
+        timings.append(frame(game, fps))
+
+    game.level.close()
+    pg.display.quit()
+    # drop the loaded level too, so the next mode starts from the same place
+    budget, assets.budget = assets.budget, 0
+    assets.evict()
+    assets.budget = budget
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, nargs=2, default=[1000, 500])
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--collectibles", type=int, default=2500)
+    parser.add_argument("--fps", type=float, default=settings["display"]["target_fps"])
+    parser.add_argument("--budget-ms", type=float)
+    parser.add_argument("--warm", action="store_true", help="keep the level cache")
+    parser.add_argument("--before", type=int, default=120)
+    parser.add_argument("--after", type=int, default=120)
+    args = parser.parse_args()
+    budget = args.budget_ms if args.budget_ms is not None else 1e3 / args.fps
+
+    width, height = args.size
+    target = f"generated/transition_{width}x{height}"
+    generate_level(target, width, height, args.density, args.collectibles)
+
+    print(
+        f"{width}x{height} level, {'warm' if args.warm else 'cold'} cache,"
+        f" {budget:.2f} ms budget"
+    )
+    print(f"{'mode':>9} {'frames':>7} {'mean (ms)':>10} {'p99':>8} {'max':>8}")
+    p99 = {}
+    frames = 0
+    for mode, staged in (("preloaded", True), ("blocking", False), ("playing", None)):
+        ms = (
+            run(target, args.fps, staged, args.warm, args.before, args.after, frames)
+            * 1e3
+        )
+        frames = frames or len(ms) - args.after
+        p99[mode] = np.percentile(ms, 99)
+        print(
+            f"{mode:>9} {len(ms):>7} {ms.mean():>10.3f}"
+            f" {p99[mode]:>8.3f} {ms.max():>8.3f}"
+        )
+
+    if p99["preloaded"] > budget:
+        print(f"\nfailed: p99 {p99['preloaded']:.2f} ms over {budget:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,46 @@
-from src.main import Game
+import argparse
+import sys
 
 
 if __name__ == "__main__":
-    game = Game(True)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--level", default="dev")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--dirty",
+        action="store_true",
+        help="redraw only what changed while the camera is still",
+    )
+    parser.add_argument(
+        "--record", metavar="PATH", help="save every tick's input to PATH on exit"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="run a recording headless as fast as possible and check where it ends",
+    )
+    args = parser.parse_args()
+
+    if args.replay:
+        from src.replay import replay
+
+        result = replay(args.replay)
+        print(
+            f"{result.ticks} ticks in {result.seconds:.2f}s"
+            f" ({result.ticks / max(result.seconds, 1e-9):.0f} ticks/s)"
+        )
+        print(f"expected {result.expected}")
+        print(f"actual   {result.actual}")
+        sys.exit(0 if result.ok else 1)
+
+    from src.main import Game
+    from src.settings import settings
+
+    game = Game(
+        True,
+        level=args.level,
+        seed=args.seed,
+        record=args.record,
+        dirty=args.dirty or settings["display"]["dirty_rects"],
+    )
     game.run()
@@ -0,0 +1,71 @@
+from .settings import *
+from .assets import assets
+
+
+class Animation:
+    """One horizontal sprite sheet sliced into frames once
+
+    Flipped frames are precomputed, so picking a frame in the hot path is a
+    tuple lookup.
+    """
+
+    def __init__(self, sheet: pg.Surface, frame_size: tuple[int, int]) -> None:
+        w, h = frame_size
+        count = max(sheet.get_width() // w, 1)
+
+        self.sheet = sheet
+        self.frames = tuple(sheet.subsurface((i * w, 0, w, h)) for i in range(count))
+        self.flipped = tuple(pg.transform.flip(f, True, False) for f in self.frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def frame(self, index: int, flipped: bool = False) -> pg.Surface:
+        return (self.flipped if flipped else self.frames)[index % len(self.frames)]
+
+
+class AnimationClock:
+    """Shared frame counter, every animation advances on the same ticks"""
+
+    def __init__(self, fps: float = 20) -> None:
+        self.frame_interval = 1 / fps
+        self.tick = 0
+
+    def update(self, now: float):
+        self.tick = int(now / self.frame_interval)
+
+    def frame(self, animation: Animation) -> int:
+        return self.tick % len(animation)
+
+
+animations: dict[tuple[str, tuple[int, int]], Animation] = {}
+
+
+def load_animation(path: str, frame_size: tuple[int, int]) -> Animation:
+    """Decode and slice a sheet once, later calls share the same frames"""
+    key = (path, frame_size)
+    animation = animations.get(key)
+    if animation is None:
+        animation = animations[key] = Animation(assets.image(path), frame_size)
+    return animation
+
+
+Masks = tuple[tuple[pg.mask.Mask, ...], tuple[pg.mask.Mask, ...]]
+masks: dict[tuple[str, tuple[int, int]], Masks] = {}
+
+
+def load_masks(path: str, frame_size: tuple[int, int]) -> Masks:
+    """Masks of a sheet's frames, unflipped then flipped
+
+    Decoded apart from `load_animation` as it needs no display, headless
+    simulations pick up collectibles with the same masks as the game.
+    """
+    key = (path, frame_size)
+    cached = masks.get(key)
+    if cached is None:
+        frames = Animation(pg.image.load(path), frame_size)
+        cached = masks[key] = (
+            tuple(pg.mask.from_surface(f) for f in frames.frames),
+            tuple(pg.mask.from_surface(f) for f in frames.flipped),
+        )
+    return cached
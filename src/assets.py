@@ -0,0 +1,327 @@
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import pygame.freetype as pgft
+
+from .settings import *
+from .levels.cache import (
+    LevelData,
+    fingerprint,
+    level_name,
+    level_path,
+    load_cached,
+    load_level_data,
+    refresh_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def lower_priority(pid: int):
+    """Let the game's process take the CPU first, on machines with few cores
+
+    Linux's idle policy only runs `pid` on a core nothing else wants, a nice
+    process still takes a slice of a core shared with the game.
+    """
+    if hasattr(os, "SCHED_IDLE"):
+        os.sched_setscheduler(pid, os.SCHED_IDLE, os.sched_param(0))
+    elif hasattr(os, "setpriority"):
+        os.setpriority(os.PRIO_PROCESS, pid, 19)
+
+
+class Entry:
+    __slots__ = ("refs", "size", "value")
+
+    def __init__(self, value, size: int) -> None:
+        self.value = value
+        self.size = size
+        self.refs = 0
+
+
+class AssetManager:
+    """Content-addressed cache for images, fonts and level data
+
+    Entries are keyed on a hash of the file contents, so the same bytes under
+    two paths decode once. Every `image`/`font`/`level` call takes a reference
+    that `release` gives back; unreferenced entries stay cached until `budget`
+    bytes are exceeded and are then evicted least recently used first.
+
+    `preload` reads, hashes and decodes files on a thread pool, the main
+    thread only stats them and runs `convert_alpha` when the image is first
+    requested or in `poll`.
+    """
+
+    def __init__(
+        self,
+        budget: int = settings["assets"]["budget"],
+        workers: int = settings["assets"]["workers"],
+    ) -> None:
+        self.budget = budget
+        self.workers = workers
+        self.executor: ThreadPoolExecutor | None = None
+        self.compiler: ProcessPoolExecutor | None = None
+        self.compiler_lock = threading.Lock()
+
+        self.entries: OrderedDict[tuple, Entry] = OrderedDict()
+        self.keys: dict[int, tuple] = {}  # id(value) -> key, for `release`
+        self.hashes: dict[str, tuple[int, str]] = {}
+        # tmx path -> the files it pulls in, as of its last load
+        self.sources: dict[str, list[str]] = {}
+        self.pending: dict[tuple, Future] = {}
+        self.memory = 0
+
+    # keys
+
+    def content_hash(self, path: str) -> str:
+        """Hash of the file bytes, recomputed only when its mtime changes"""
+        digest = self.known_hash(path)
+        if digest is None:
+            self.read_hashed(path)
+            digest = self.hashes[path][1]
+        return digest
+
+    def known_hash(self, path: str) -> str | None:
+        """Hash of the file if unchanged since it was last read, only stats it"""
+        cached = self.hashes.get(path)
+        if cached and cached[0] == os.stat(path).st_mtime_ns:
+            return cached[1]
+        return None
+
+    def read_hashed(self, path: str) -> bytes:
+        """The file's bytes, recording their hash on the way"""
+        mtime = os.stat(path).st_mtime_ns
+        data = read(path)
+        self.hashes[path] = (mtime, hashlib.blake2b(data, digest_size=16).hexdigest())
+        return data
+
+    def image_key(self, path: str) -> tuple:
+        return ("image", self.content_hash(path))
+
+    def font_key(self, path: str, size: int) -> tuple:
+        return ("font", self.content_hash(path), size)
+
+    def file_key(self, kind: str, path: str) -> tuple:
+        """Key of a pending preload, hashing is left to the worker reading it"""
+        return (kind, path, os.stat(path).st_mtime_ns)
+
+    def level_key(self, name: str) -> tuple:
+        """Keyed on the mtimes of every file the level pulls in, like its disk cache
+
+        Only stats them, as it runs on the main thread for
+        `SceneManager.preload`. Which files those are is learnt from the
+        loaded data, before that the TMX's mtime alone never matches an entry.
+        """
+        tmx = level_path(name)
+        paths = self.sources.get(tmx, [tmx])
+        return ("level", name, tuple(fingerprint(paths).values()))
+
+    def level_data_key(self, name: str) -> tuple:
+        return ("level_data", name)
+
+    # loading
+
+    def acquire(self, key: tuple, load) -> object:
+        entry = self.entries.get(key)
+        if entry is None:
+            value, size = load()
+            entry = self.store(key, value, size)
+        else:
+            self.entries.move_to_end(key)
+
+        entry.refs += 1
+        return entry.value
+
+    def store(self, key: tuple, value, size: int) -> Entry:
+        entry = self.entries[key] = Entry(value, size)
+        self.keys[id(value)] = key
+        self.memory += size
+        self.evict()
+        return entry
+
+    def image(self, path: str) -> pg.Surface:
+        # a preload has hashed the file by the time it is done
+        decoded = self.take_pending(self.file_key("image_file", path))
+        key = self.image_key(path)
+
+        def load():
+            surface = (decoded or pg.image.load(path)).convert_alpha()
+            return surface, surface.get_width() * surface.get_height() * 4
+
+        return self.acquire(key, load)
+
+    def font(self, path: str, size: int) -> pgft.Font:
+        data = self.take_pending(self.file_key("font_file", path))
+        key = self.font_key(path, size)
+
+        def load():
+            if not pgft.get_init():
+                pgft.init()
+            contents = data if data is not None else read(path)
+            # freetype reads lazily from the file object, keep it alive with the font
+            font = pgft.Font(io.BytesIO(contents), size, False, False)
+            return font, len(contents)
+
+        return self.acquire(key, load)
+
+    def level(self, name: str) -> LevelData:
+        key = self.level_key(name)
+        data = None
+        if key not in self.entries:
+            data = self.take_pending(self.level_data_key(name)) or load_level_data(name)
+            self.sources[level_path(name)] = list(data.sources)
+            # stored under the mtimes it was compiled from
+            key = ("level", name, tuple(data.sources.values()))
+
+        def load():
+            size = data.gids.nbytes + data.atlas.nbytes + data.collectibles.nbytes
+            size += sum(array.nbytes for array in data.sorted_tiles)
+            return data, size
+
+        return self.acquire(key, load)
+
+    def release(self, value: object):
+        """Give back one reference taken by `image`, `font` or `level`"""
+        entry = self.entries.get(self.keys.get(id(value)))
+        if entry is not None and entry.value is value:
+            entry.refs = max(entry.refs - 1, 0)
+        self.evict()
+
+    def evict(self):
+        if self.memory <= self.budget:
+            return
+
+        for key in list(self.entries):
+            entry = self.entries[key]
+            if entry.refs:
+                continue
+            del self.entries[key]
+            self.keys.pop(id(entry.value), None)
+            self.memory -= entry.size
+            if self.memory <= self.budget:
+                break
+
+    # background preloading
+
+    def submit(self, key: tuple, decode) -> Future:
+        future = self.pending.get(key)
+        if future is None and key not in self.entries:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="assets"
+                )
+            future = self.pending[key] = self.executor.submit(decode)
+        return future
+
+    def take_pending(self, key: tuple):
+        """Result of a preload for `key`, waiting for it if still running"""
+        future = self.pending.pop(key, None)
+        return future.result() if future is not None else None
+
+    def preload(self, *paths: str) -> list[Future]:
+        """Decode files ahead of time off the main thread
+
+        Images and fonts are given by path, levels by their TMX path.
+        """
+        futures = []
+        for path in paths:
+            # the main thread only stats files, the workers read and hash them
+            if path.endswith(IMAGE_EXTENSIONS):
+                future = None
+                digest = self.known_hash(path)
+                if digest is None or ("image", digest) not in self.entries:
+                    # decoding only, surfaces are converted on the main thread
+                    future = self.submit(
+                        self.file_key("image_file", path),
+                        lambda p=path: pg.image.load(
+                            io.BytesIO(self.read_hashed(p)), p
+                        ),
+                    )
+            elif path.endswith(FONT_EXTENSIONS):
+                future = self.submit(
+                    self.file_key("font_file", path), lambda p=path: self.read_hashed(p)
+                )
+            elif path.endswith(".tmx"):
+                name = level_name(path)
+                future = None
+                if self.level_key(name) not in self.entries:
+                    future = self.submit(
+                        self.level_data_key(name), lambda p=path: self.decode_level(p)
+                    )
+            else:
+                raise ValueError(f"don't know how to preload {path}")
+
+            if future is not None:
+                futures.append(future)
+        return futures
+
+    def start_compiler(self) -> ProcessPoolExecutor:
+        """The process compiling level caches, started by the first stale one
+
+        Called from the workers, hence the lock.
+        """
+        with self.compiler_lock:
+            if self.compiler is None:
+                started = set(multiprocessing.active_children())
+                self.compiler = ProcessPoolExecutor(
+                    1, multiprocessing.get_context("spawn")
+                )
+                # the process starts with the first task, lowered before it boots
+                # as importing the game's modules takes as long as a compile
+                self.compiler.submit(os.getpid)
+                for process in set(multiprocessing.active_children()) - started:
+                    lower_priority(process.pid)
+            return self.compiler
+
+    def decode_level(self, path: str) -> LevelData:
+        """Memory-map the level and decode its atlas, on a worker
+
+        A stale cache is compiled in a separate, lower priority process first,
+        parsing the TMX is pure Python and would hold the GIL against the main
+        thread.
+        """
+        name = level_name(path)
+        data = load_cached(name)
+        if data is None:
+            self.start_compiler().submit(refresh_cache, name).result()
+            data = load_level_data(name)
+        data.decode_atlas()
+        return data
+
+    def poll(self, budget: float = 0.002):
+        """Convert finished image preloads on the main thread for up to `budget` s"""
+        start = time.perf_counter()
+        for key, future in list(self.pending.items()):
+            if time.perf_counter() - start > budget:
+                break
+            if key[0] != "image_file" or not future.done():
+                continue
+
+            del self.pending[key]
+            try:
+                surface = future.result().convert_alpha()
+                image_key = self.image_key(key[1])
+            except Exception:
+                # dropped, loading it for real raises where it is used
+                logger.exception("preloading %s failed", key)
+                continue
+            if image_key not in self.entries:
+                size = surface.get_width() * surface.get_height() * 4
+                self.store(image_key, surface, size)
+
+
+assets = AssetManager()
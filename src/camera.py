@@ -6,6 +6,17 @@ class Camera:
         self.smoothness = settings["camera"]["smoothness"]
         self.scroll = vector(0, 0)
         self.follow: pg.Rect = None
+        # what the frame is drawn at, `scroll` rounded to whole pixels when snapping
+        self.snap = False
+        self.view = vector(0, 0)
+
+    def center(self, size: tuple[int, int]):
+        """Jump straight to `follow`, as the first frame of a level shows it"""
+        self.scroll.update(
+            self.follow.x + self.follow.w / 2 - size[0] / 2,
+            self.follow.y + self.follow.h / 2 - size[1] / 2,
+        )
+        self.update_view()
 
     def update(self, target: pg.Surface, dt: float):
         if (
@@ -36,3 +47,11 @@ class Camera:
                 * dt
                 * 1000
             )
+
+        self.update_view()
+
+    def update_view(self):
+        if self.snap:
+            self.view.update(round(self.scroll.x), round(self.scroll.y))
+        else:
+            self.view.update(self.scroll)
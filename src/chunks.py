@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+from .settings import *
+from .tiles import TileLayer
+
+
+class ChunkRenderer:
+    """Draws a static tile layer from pre-baked chunk surfaces
+
+    Chunks are baked lazily the first time they become visible and kept in an
+    LRU. Chunks that stay off-screen for `idle_frames` frames, or the least
+    recently seen ones once `budget` bytes are exceeded, are dropped and
+    re-baked on demand.
+    """
+
+    def __init__(
+        self,
+        tiles: TileLayer,
+        chunk_size: int = settings["render"]["chunk_size"],
+        budget: int = settings["render"]["chunk_budget"],
+        idle_frames: int = settings["render"]["chunk_idle_frames"],
+    ) -> None:
+        self.tiles = tiles
+        self.chunk_size = chunk_size
+        self.budget = budget
+        self.idle_frames = idle_frames
+
+        self.chunks: OrderedDict[tuple[int, int], pg.Surface] = OrderedDict()
+        self.last_seen: dict[tuple[int, int], int] = {}
+        self.chunk_bytes = chunk_size * chunk_size * 4
+        self.frame = 0
+        self.view = pg.FRect(0, 0, 0, 0)
+        # chunks that appeared other than by baking in `draw`, see `DirtyRenderer`
+        self.installed = 0
+
+    @property
+    def memory(self) -> int:
+        return len(self.chunks) * self.chunk_bytes
+
+    def bake(self, key: tuple[int, int]) -> pg.Surface:
+        size = self.chunk_size
+        origin = (key[0] * size, key[1] * size)
+        surface = pg.Surface((size, size), pg.SRCALPHA)
+
+        # tiles straddling the chunk edge are clipped and baked into both chunks
+        surface.blits(self.tiles.blits(pg.Rect(origin, (size, size))), doreturn=False)
+        return surface
+
+    def invalidate(self, rect: pg.Rect | pg.FRect | None = None):
+        """Drop baked chunks overlapping `rect`, or all of them"""
+        if rect is None:
+            self.chunks.clear()
+            self.last_seen.clear()
+            return
+
+        for key in self.keys(rect):
+            self.chunks.pop(key, None)
+            self.last_seen.pop(key, None)
+
+    def evict(self):
+        frame = self.frame
+        for key in list(self.chunks):
+            if frame - self.last_seen[key] > self.idle_frames:
+                del self.chunks[key]
+                del self.last_seen[key]
+
+        # oldest first, never what was drawn this frame
+        while self.memory > self.budget:
+            key = next(iter(self.chunks))
+            if self.last_seen[key] == frame:
+                break
+            del self.chunks[key]
+            del self.last_seen[key]
+
+    def keys(self, rect: pg.Rect | pg.FRect) -> list[tuple[int, int]]:
+        """Chunks overlapping `rect`, in pixels"""
+        size = self.chunk_size
+        return [
+            (cx, cy)
+            for cy in range(int(rect.top // size), int((rect.bottom - 1) // size) + 1)
+            for cx in range(int(rect.left // size), int((rect.right - 1) // size) + 1)
+        ]
+
+    def get(self, key: tuple[int, int]) -> pg.Surface | None:
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self.bake(key)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def warm(self, rect: pg.Rect | pg.FRect, limit: int = 1):
+        """Bake up to `limit` missing chunks under `rect` ahead of drawing them"""
+        for key in self.keys(rect):
+            if limit <= 0:
+                break
+            if key not in self.chunks:
+                if self.get(key) is not None:
+                    self.last_seen[key] = self.frame
+                limit -= 1
+
+    def draw(self, target: pg.Surface, scroll: vector):
+        self.frame += 1
+        size = self.chunk_size
+
+        self.view.update(scroll, target.get_size())
+        for key in self.keys(self.view):
+            chunk = self.get(key)
+            if chunk is None:
+                continue
+            self.last_seen[key] = self.frame
+
+            # floor, not truncate, so chunks left of / above the origin line
+            # up with per-tile positions
+            target.blit(
+                chunk,
+                (
+                    math.floor(key[0] * size - scroll.x),
+                    math.floor(key[1] * size - scroll.y),
+                ),
+            )
+
+        self.evict()
@@ -0,0 +1,76 @@
+import numpy as np
+
+from .settings import *
+
+
+class TileGrid:
+    """One byte per tile occupancy grid with a per-axis tile-stepping resolver
+
+    Cells outside the grid are empty. Moving rects are resolved one axis at a
+    time, only the cells between their old and new edge are looked at.
+    """
+
+    def __init__(self, solid: np.ndarray, tile_size: int = TILE_SIZE) -> None:
+        self.solid = np.ascontiguousarray(solid, dtype=np.uint8)
+        self.tile_size = tile_size
+        self.rows, self.columns = self.solid.shape
+
+    def rows_of(self, top: float, bottom: float) -> tuple[int, int]:
+        size = self.tile_size
+        return max(math.floor(top / size), 0), min(math.ceil(bottom / size), self.rows)
+
+    def columns_of(self, left: float, right: float) -> tuple[int, int]:
+        size = self.tile_size
+        return max(math.floor(left / size), 0), min(
+            math.ceil(right / size), self.columns
+        )
+
+    def sweep_x(self, rect: pg.FRect, old_left: float) -> int:
+        """Move `rect` back out of the first solid column it swept into
+
+        Returns the direction of the hit (1 right, -1 left) or 0.
+        """
+        size = self.tile_size
+        top, bottom = self.rows_of(rect.top, rect.bottom)
+        if top >= bottom:
+            return 0
+
+        if rect.left > old_left:
+            # columns whose left edge lies between the old and new right edge
+            first = math.ceil((old_left + rect.w) / size)
+            last = math.ceil(rect.right / size) - 1
+            for column in range(max(first, 0), min(last, self.columns - 1) + 1):
+                if self.solid[top:bottom, column].any():
+                    rect.right = column * size
+                    return 1
+        elif rect.left < old_left:
+            first = math.floor(old_left / size) - 1
+            last = math.floor(rect.left / size)
+            for column in range(min(first, self.columns - 1), max(last, 0) - 1, -1):
+                if self.solid[top:bottom, column].any():
+                    rect.left = (column + 1) * size
+                    return -1
+        return 0
+
+    def sweep_y(self, rect: pg.FRect, old_top: float) -> int:
+        """Same as `sweep_x` on the vertical axis, 1 is a hit below"""
+        size = self.tile_size
+        left, right = self.columns_of(rect.left, rect.right)
+        if left >= right:
+            return 0
+
+        if rect.top > old_top:
+            first = math.ceil((old_top + rect.h) / size)
+            last = math.ceil(rect.bottom / size) - 1
+            for row in range(max(first, 0), min(last, self.rows - 1) + 1):
+                if self.solid[row, left:right].any():
+                    rect.bottom = row * size
+                    return 1
+        elif rect.top < old_top:
+            first = math.floor(old_top / size) - 1
+            last = math.floor(rect.top / size)
+            for row in range(min(first, self.rows - 1), max(last, 0) - 1, -1):
+                if self.solid[row, left:right].any():
+                    rect.top = (row + 1) * size
+                    return -1
+        return 0
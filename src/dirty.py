@@ -0,0 +1,57 @@
+from .settings import *
+
+
+class DirtyRenderer:
+    """Redraws and presents only what changed while the camera holds still
+
+    The background (clear color and walls) is cached at the whole-pixel camera
+    position it was drawn at. While that position holds, a frame restores last
+    frame's sprite rects from the cache, draws the sprites again and returns
+    both sets of rects to present. A moved camera, a chunk streamed in, or
+    rects covering more than `max_coverage` of the target redraw everything
+    and return None, for a full present.
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int],
+        color: pg.Color,
+        max_coverage: float = settings["display"]["dirty_max_coverage"],
+    ) -> None:
+        self.background = pg.Surface(size, depth=32)
+        self.color = color
+        self.max_area = size[0] * size[1] * max_coverage
+        self.key: tuple | None = None  # what the background was drawn at
+        self.previous: list[pg.Rect] = []
+
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        self.key = None
+
+    def draw(self, level, target: pg.Surface) -> list[pg.Rect] | None:
+        level.prepare_draw(target)
+        view = level.camera.view
+        key = (view.x, view.y, level.wall_renderer.installed)
+
+        previous = self.previous
+        self.previous = []
+        if key == self.key:
+            target.blits(
+                [(self.background, rect, rect) for rect in previous], doreturn=False
+            )
+            level.draw_sprites(target, self.previous)
+            rects = previous + self.previous
+            if sum(rect.w * rect.h for rect in rects) <= self.max_area:
+                self.partial_frames += 1
+                return rects
+        else:
+            self.key = key
+            self.background.fill(self.color)
+            level.draw_background(self.background)
+            target.blit(self.background, (0, 0))
+            level.draw_sprites(target, self.previous)
+
+        self.full_frames += 1
+        return None
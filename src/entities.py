@@ -0,0 +1,245 @@
+import numpy as np
+
+from .settings import *
+
+
+class EntityStore:
+    """Struct-of-arrays storage for static rect entities such as collectibles
+
+    Live entities are always packed in `[0, count)`; removal swaps the last
+    live entity into the freed slot, so an index is only valid until the next
+    removal. Overlap tests, bobbing and culling run on whole arrays, into
+    preallocated scratch arrays so they allocate nothing per entity.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.count = 0
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.w = np.zeros(capacity, np.float32)
+        self.h = np.zeros(capacity, np.float32)
+        self.phase = np.zeros(capacity, np.float32)
+        self.value = np.zeros(capacity, np.int32)
+        self.sprite = np.zeros(capacity, np.int32)
+        self.alive = np.zeros(capacity, np.bool_)
+        self.scratch(capacity)
+
+        # sprite id -> surface, shared by every entity using it
+        self.sprites: list[pg.Surface] = []
+        self.sprite_ids: dict[int, int] = {}
+        # made the first time a pixel-perfect pickup tests the sprite
+        self.masks: list[pg.mask.Mask | None] = []
+
+        self.bob_speed = 5
+        self.bob_height = 1.2
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def columns(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.x,
+            self.y,
+            self.w,
+            self.h,
+            self.phase,
+            self.value,
+            self.sprite,
+            self.alive,
+        )
+
+    def scratch(self, capacity: int):
+        self.scratch_x = np.zeros(capacity, np.float32)
+        self.scratch_y = np.zeros(capacity, np.float32)
+        self.scratch_edge = np.zeros(capacity, np.float32)
+        self.scratch_mask = np.zeros(capacity, np.bool_)
+        self.scratch_test = np.zeros(capacity, np.bool_)
+
+    def grow(self, capacity: int):
+        for name in ("x", "y", "w", "h", "phase", "value", "sprite", "alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, column.dtype)
+            grown[: self.count] = column[: self.count]
+            setattr(self, name, grown)
+        self.scratch(capacity)
+
+    def sprite_id(self, surface: pg.Surface) -> int:
+        sprite = self.sprite_ids.get(id(surface))
+        if sprite is None:
+            sprite = self.sprite_ids[id(surface)] = len(self.sprites)
+            self.sprites.append(surface)
+            self.masks.append(None)
+        return sprite
+
+    def sprite_mask(self, sprite: int) -> pg.mask.Mask:
+        mask = self.masks[sprite]
+        if mask is None:
+            mask = self.masks[sprite] = pg.mask.from_surface(self.sprites[sprite])
+        return mask
+
+    def add(
+        self, x: float, y: float, surface: pg.Surface, value: int = 1, phase: float = 0
+    ) -> int:
+        if self.count == len(self.x):
+            self.grow(len(self.x) * 2)
+
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.w[i], self.h[i] = surface.get_size()
+        self.phase[i] = phase
+        self.value[i] = value
+        self.sprite[i] = self.sprite_id(surface)
+        self.alive[i] = True
+        self.count += 1
+        return i
+
+    def add_many(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        surface: pg.Surface,
+        value: np.ndarray | int = 1,
+        phase: np.ndarray | float = 0,
+    ):
+        """`add` for a batch of entities sharing one sprite"""
+        n = len(x)
+        capacity = len(self.x)
+        while self.count + n > capacity:
+            capacity *= 2
+        if capacity != len(self.x):
+            self.grow(capacity)
+
+        s = slice(self.count, self.count + n)
+        self.x[s] = x
+        self.y[s] = y
+        self.w[s], self.h[s] = surface.get_size()
+        self.phase[s] = phase
+        self.value[s] = value
+        self.sprite[s] = self.sprite_id(surface)
+        self.alive[s] = True
+        self.count += n
+
+    def within(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        left: float,
+        top: float,
+        right: float,
+        bottom: float,
+    ) -> np.ndarray:
+        """Indices of entities whose box at (x, y) overlaps the given edges"""
+        n = len(x)
+        hits = self.scratch_mask[:n]
+        test = self.scratch_test[:n]
+        edge = self.scratch_edge[:n]
+
+        np.less(x, right, out=hits)
+        np.less(y, bottom, out=test)
+        hits &= test
+        np.greater(np.add(x, self.w[:n], out=edge), left, out=test)
+        hits &= test
+        np.greater(np.add(y, self.h[:n], out=edge), top, out=test)
+        hits &= test
+        return np.flatnonzero(hits)
+
+    def overlap(self, rect: pg.Rect | pg.FRect) -> np.ndarray:
+        """Indices of live entities overlapping `rect`, `colliderect` semantics"""
+        n = self.count
+        return self.within(
+            self.x[:n], self.y[:n], rect.left, rect.top, rect.right, rect.bottom
+        )
+
+    def remove(self, indices: np.ndarray):
+        # highest first, so a swapped-in entity is never one still to remove
+        for i in np.sort(indices)[::-1]:
+            last = self.count - 1
+            for column in self.columns:
+                column[i] = column[last]
+            self.alive[last] = False
+            self.count = last
+
+    def snapshot(self) -> tuple[np.ndarray, ...]:
+        """Copies of the live part of every column"""
+        n = self.count
+        return tuple(column[:n].copy() for column in self.columns)
+
+    def restore(self, snapshot: tuple[np.ndarray, ...]):
+        n = len(snapshot[0])
+        if n > len(self.x):
+            self.grow(n)
+        for column, saved in zip(self.columns, snapshot):
+            column[:n] = saved
+        self.alive[n : self.count] = False
+        self.count = n
+
+    def mask_overlap(
+        self, indices: np.ndarray, rect: pg.Rect | pg.FRect, mask: pg.mask.Mask
+    ) -> np.ndarray:
+        """The entities of `indices` whose sprite pixels touch `mask` at `rect`"""
+        x, y = int(rect.x), int(rect.y)
+        keep = [
+            self.sprite_mask(self.sprite[i]).overlap(
+                mask, (x - int(self.x[i]), y - int(self.y[i]))
+            )
+            is not None
+            for i in indices
+        ]
+        return indices[np.array(keep, np.bool_)]
+
+    def collect(
+        self, rect: pg.Rect | pg.FRect, mask: pg.mask.Mask | None = None
+    ) -> int:
+        """Remove everything overlapping `rect`, returns their summed value
+
+        With a `mask` the rect test only picks candidates, they are then tested
+        pixel by pixel against their sprite's mask.
+        """
+        hits = self.overlap(rect)
+        if len(hits) and mask is not None:
+            hits = self.mask_overlap(hits, rect, mask)
+        if not len(hits):
+            return 0
+
+        total = int(self.value[hits].sum())
+        self.remove(hits)
+        return total
+
+    def draw(
+        self,
+        target: pg.Surface,
+        scroll: vector,
+        now: float,
+        dirty: list[pg.Rect] | None = None,
+    ):
+        """Draw the visible entities, adding the rects drawn to `dirty` if given"""
+        n = self.count
+        if not n:
+            return
+
+        x = np.subtract(self.x[:n], scroll.x, out=self.scratch_x[:n])
+        y = np.subtract(self.y[:n], scroll.y, out=self.scratch_y[:n])
+        bob = np.add(self.phase[:n], now * self.bob_speed, out=self.scratch_edge[:n])
+        np.sin(bob, out=bob)
+        bob *= self.bob_height
+        y += bob
+
+        visible = self.within(x, y, 0, 0, *target.get_size())
+        if not len(visible):
+            return
+
+        sprites = self.sprites
+        blits = [
+            (sprites[sprite], (dx, dy))
+            for sprite, dx, dy in zip(
+                self.sprite[visible].tolist(),
+                np.floor(x[visible]).astype(np.int32).tolist(),
+                np.floor(y[visible]).astype(np.int32).tolist(),
+            )
+        ]
+        if dirty is None:
+            target.fblits(blits)
+        else:
+            dirty += target.blits(blits)
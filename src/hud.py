@@ -1,31 +1,81 @@
-import numpy as np
+from collections import OrderedDict
+
 from .settings import *
+from .profiler import RingBuffer, profiler
+from .assets import assets
 import pygame.freetype as pgft
-import random
 
+SPAN_COLORS = (
+    (218, 113, 127),
+    (83, 191, 92),
+    (253, 187, 109),
+    (44, 197, 246),
+    (180, 124, 170),
+    (80, 150, 150),
+    (69, 92, 123),
+    (236, 130, 70),
+)
 
-class Hud:
-    pgft.init()
 
+class TextCache:
+    """LRU of rendered lines keyed on everything that affects their pixels"""
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = capacity
+        self.surfaces: OrderedDict[tuple, pg.Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+    def get(self, key: tuple) -> pg.Surface | None:
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key: tuple, surface: pg.Surface):
+        self.surfaces[key] = surface
+        self.surfaces.move_to_end(key)
+        while len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+
+
+class Hud:
     def __init__(self, game) -> None:
         from .main import Game
 
         self.game: Game = game
 
-        self.font = pgft.Font(r"assets/fonts/default.ttf", 12, False, False)
+        self.font = assets.font("assets/fonts/default.ttf", 12)
 
         self.last_update_at = 0
         self.update_interval = 1 / 10
 
         self.debug_lines = {}
-        self.rendered_lines = []
+        self.rendered_lines: dict[str, pg.Surface | None] = {}
+        self.text_cache = TextCache()
+
+        # only dirty lines are re-rendered, the panel is recomposed when any is
+        self.dirty: set[str] = set()
+        self.layout_dirty = False
+        self.panel: pg.Surface | None = None
+
+        self.separators = 0
+        self.separator_count = 0
+
+        self.fps_history = RingBuffer(30)
 
-        self.fps_list = []
+        # frame time graph, scrolled one column per frame
+        self.graph = pg.Surface((240, 60), pg.SRCALPHA)
+        self.graph_budget = 1 / self.game.target_fps
+        self.graph_scale = self.graph.get_height() / (2 * self.graph_budget)
 
+    @profiler.profile("hud.update")
     def update(self, dt: float):
         if self.game.now - self.last_update_at < self.update_interval:
             return
         self.last_update_at = self.game.now
+        self.separator_count = 0
 
         self.debug(
             "dt",
@@ -34,12 +84,11 @@ class Hud:
             unit="ms",
         )
 
-        self.fps_list.append(math.floor(self.game.clock.get_fps()))
-        self.fps_list = self.fps_list[-30:]
+        self.fps_history.append(math.floor(self.game.clock.get_fps()))
 
         self.debug(
             "fps",
-            math.floor(np.mean(self.fps_list)),
+            math.floor(self.fps_history.mean()),
             "\u2211",
             (218, 113, 127),
         )
@@ -51,7 +100,7 @@ class Hud:
             key = settings["keybinds"]["movements"][bind]
             self.debug(
                 f"bind_{bind}",
-                f"{bind.upper()}: {"SPACE" if key == " " else key.upper()}",
+                f"{bind.upper()}: {'SPACE' if key == ' ' else key.upper()}",
             )
 
         self.debug_separator()
@@ -61,43 +110,144 @@ class Hud:
             key = settings["keybinds"]["misc"][bind]
             self.debug(
                 f"bind_{bind}",
-                f"{bind.upper()}: {"SPACE" if key == " " else str(key).upper()}",
+                f"{bind.upper()}: {'SPACE' if key == ' ' else str(key).upper()}",
                 bg_color=(83, 191, 92),
             )
 
+        self.debug_spans()
+        self.debug_scheduler()
+
+        # separators that were not re-issued this update
+        for n in range(self.separator_count, self.separators):
+            self.remove_debug(f"sep_{n}")
+        self.separators = self.separator_count
+
         self.redraw()
 
+    def debug_spans(self):
+        if not profiler.enabled:
+            for key in [key for key in self.debug_lines if key.startswith("span_")]:
+                self.remove_debug(key)
+            return
+
+        self.debug_separator()
+        averages = profiler.history.mean(60)
+        for column, name in enumerate(profiler.names, 1):
+            self.debug(
+                f"span_{name}",
+                f"{averages[column] * 1_000:.2f}",
+                f"{'  ' * profiler.depths[column - 1]}{name}",
+                SPAN_COLORS[column % len(SPAN_COLORS)],
+                unit="ms",
+            )
+
+    def debug_scheduler(self):
+        """Totals of the work `FrameScheduler` pushed out of busy frames"""
+        stats = self.game.scheduler.stats.values()
+        self.debug(
+            "scheduler",
+            f"{sum(s.deferred for s in stats)} deferred"
+            f" {sum(s.dropped for s in stats)} dropped"
+            f" {sum(s.forced for s in stats)} forced",
+            "\u231b",
+            (80, 150, 150),
+        )
+
     def redraw(self):
-        self.rendered_lines.clear()
+        if not self.dirty and not self.layout_dirty:
+            return
 
-        for debug_line in self.debug_lines.values():
+        for key in self.dirty:
+            if key not in self.debug_lines:
+                continue
+
+            debug_line = self.debug_lines[key]
             if debug_line is None:
-                rendered_line = None
+                self.rendered_lines[key] = None
             else:
-                value = debug_line.get("value")
-                label = debug_line.get("label")
-                unit = debug_line.get("unit")
-                fg_color = debug_line.get("fg_color", (255, 255, 255))
-                bg_color = debug_line.get("bg_color", (253, 187, 109))
-
-                rendered_line = self.render_font(
-                    f'{label + " " if label else ""}{value}{unit if unit else ""}',
-                    20,
-                    fg_color,
-                    bg_color,
-                    5,
-                )
-            self.rendered_lines.append(rendered_line)
-
-    def draw(self, surface: pg.Surface, *args):
+                self.rendered_lines[key] = self.render_line(debug_line)
+
+        self.dirty.clear()
+        self.layout_dirty = False
+        self.compose()
+
+    def render_line(self, debug_line: dict) -> pg.Surface:
+        value = debug_line.get("value")
+        label = debug_line.get("label")
+        unit = debug_line.get("unit")
+        fg_color = debug_line.get("fg_color", (255, 255, 255))
+        bg_color = debug_line.get("bg_color", (253, 187, 109))
+
+        content = f"{label + ' ' if label else ''}{value}{unit if unit else ''}"
+        cache_key = (content, tuple(fg_color), tuple(bg_color), 20, 5)
+
+        rendered_line = self.text_cache.get(cache_key)
+        if rendered_line is None:
+            rendered_line = self.render_font(content, 20, fg_color, bg_color, 5)
+            self.text_cache.put(cache_key, rendered_line)
+        return rendered_line
+
+    def compose(self):
+        """Stack every rendered line into the one panel surface `draw` blits"""
+        lines = [self.rendered_lines[key] for key in self.debug_lines]
+        width = max((line.get_width() for line in lines if line), default=0)
+        height = sum(20 if line is None else line.get_height() for line in lines)
+
+        if self.panel is None or self.panel.get_size() != (width, height):
+            self.panel = pg.Surface((width, height), pg.SRCALPHA)
+        else:
+            self.panel.fill((0, 0, 0, 0))
+
         h = 0
-        for rendered_line in self.rendered_lines:
+        for rendered_line in lines:
             if rendered_line is None:
                 h += 20
             else:
-                surface.blit(rendered_line, (0, h))
+                self.panel.blit(rendered_line, (0, h))
                 h += rendered_line.get_height()
 
+    def draw(self, surface: pg.Surface, *args) -> list[pg.Rect]:
+        """Draw onto the overlay, returns the rects drawn"""
+        rects = []
+        if self.panel is not None:
+            rects.append(surface.blit(self.panel, (0, 0)))
+
+        if profiler.enabled:
+            rects.append(self.draw_graph(surface))
+        return rects
+
+    def draw_graph(self, surface: pg.Surface) -> pg.Rect:
+        """Append the last frame as a column of stacked top level spans"""
+        graph = self.graph
+        width, height = graph.get_size()
+        frame = profiler.last_frame()
+
+        graph.scroll(-1, 0)
+        graph.fill((0, 0, 0, 160), (width - 1, 0, 1, height))
+
+        bottom = height
+        for column in profiler.top_level:
+            top = bottom - frame[column] * self.graph_scale
+            pg.draw.line(
+                graph,
+                SPAN_COLORS[column % len(SPAN_COLORS)],
+                (width - 1, bottom),
+                (width - 1, top),
+            )
+            bottom = top
+
+        # whatever the spans do not cover, up to the frame total
+        top = height - frame[0] * self.graph_scale
+        if top < bottom:
+            pg.draw.line(graph, (120, 120, 120), (width - 1, bottom), (width - 1, top))
+
+        budget = height - self.graph_budget * self.graph_scale
+        graph.set_at((width - 1, int(budget)), (255, 255, 255))
+
+        return surface.blit(
+            graph, (surface.get_width() - width, surface.get_height() - height)
+        )
+
     def debug(
         self,
         key: str,
@@ -107,21 +257,47 @@ class Hud:
         fg_color: pg.Color | None = None,
         unit: str | None = None,
     ):
-        self.debug_lines[key] = {
-            "value": str(value),
+        value = str(value)
+        # most lines are unchanged, compare before building a new dict
+        line = self.debug_lines.get(key)
+        if (
+            line is not None
+            and line["value"] == value
+            and line.get("label") == (label or None)
+            and line.get("unit") == (unit or None)
+            and line.get("bg_color") == (bg_color or None)
+            and line.get("fg_color") == (fg_color or None)
+        ):
+            return
+
+        debug_line = {
+            "value": value,
         }
 
         if label:
-            self.debug_lines[key]["label"] = label
+            debug_line["label"] = label
         if unit:
-            self.debug_lines[key]["unit"] = unit
+            debug_line["unit"] = unit
         if bg_color:
-            self.debug_lines[key]["bg_color"] = bg_color
+            debug_line["bg_color"] = bg_color
         if fg_color:
-            self.debug_lines[key]["fg_color"] = fg_color
+            debug_line["fg_color"] = fg_color
+
+        self.debug_lines[key] = debug_line
+        self.dirty.add(key)
 
     def debug_separator(self):
-        self.debug_lines[f"sep_{random.randint(100, 999)}"] = None
+        key = f"sep_{self.separator_count}"
+        self.separator_count += 1
+
+        if key not in self.debug_lines:
+            self.debug_lines[key] = None
+            self.dirty.add(key)
+
+    def remove_debug(self, key: str):
+        if self.debug_lines.pop(key, 0) != 0:
+            self.rendered_lines.pop(key, None)
+            self.layout_dirty = True
 
     def render_font(
         self,
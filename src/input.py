@@ -0,0 +1,47 @@
+from collections.abc import Callable
+from typing import NamedTuple
+
+from .settings import *
+
+
+class InputState(NamedTuple):
+    """Everything gameplay reads from the player's input for one frame"""
+
+    left: bool = False
+    right: bool = False
+    jump: bool = False
+    debug: bool = False  # toggle, only set on the frame it was pressed
+    retry: bool = False  # likewise
+
+
+class KeyboardInput:
+    def __init__(self) -> None:
+        self.movement_binds = settings["keybinds"]["movements"]
+        self.debug_bind = settings["keybinds"]["misc"]["debug"]
+        self.retry_bind = settings["keybinds"]["misc"]["retry"]
+
+    def read(self, events: list[pg.Event]) -> InputState:
+        keys = pg.key.get_pressed()
+
+        just_pressed = pg.key.get_just_pressed()
+
+        return InputState(
+            keys[ord(self.movement_binds["left"])],
+            keys[ord(self.movement_binds["right"])],
+            keys[ord(self.movement_binds["jump"])],
+            just_pressed[self.debug_bind],
+            just_pressed[self.retry_bind],
+        )
+
+
+class ScriptedInput:
+    """Feeds `script(frame)` instead of the keyboard, for benchmarks and tools"""
+
+    def __init__(self, script: Callable[[int], InputState]) -> None:
+        self.script = script
+        self.frame = 0
+
+    def read(self, events: list[pg.Event]) -> InputState:
+        state = self.script(self.frame)
+        self.frame += 1
+        return state
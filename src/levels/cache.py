@@ -0,0 +1,319 @@
+import json
+import os
+
+import numpy as np
+
+from ..settings import *
+from ..tiles.layer import SortedTiles, sort_tiles
+
+CACHE_VERSION = 3
+CACHE_DIR = ".cache/levels"
+LEVEL_DIR = "assets/levels"
+
+collectible_dtype = np.dtype([("x", "f4"), ("y", "f4"), ("gid", "i4"), ("value", "i4")])
+
+
+def level_path(name: str) -> str:
+    return f"{LEVEL_DIR}/{name}.tmx"
+
+
+def level_name(path: str) -> str:
+    """Inverse of `level_path`"""
+    return os.path.relpath(os.path.splitext(path)[0], LEVEL_DIR).replace(os.sep, "/")
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(CACHE_DIR, name)
+
+
+def dependencies(tmx: str) -> list[str]:
+    """The TMX file plus every TSX, template and tileset image it pulls in"""
+    import xml.etree.ElementTree as ET
+
+    found = [os.path.normpath(tmx)]
+    pending = [tmx]
+
+    while pending:
+        path = pending.pop()
+        if not os.path.exists(path):
+            continue
+        root = ET.parse(path).getroot()
+        base = os.path.dirname(path)
+
+        refs = [el.get("source") for el in root.iter("tileset")]
+        refs += [el.get("template") for el in root.iter("object")]
+        images = [el.get("source") for el in root.iter("image")]
+
+        for ref in refs + images:
+            if not ref:
+                continue
+            ref = os.path.normpath(os.path.join(base, ref))
+            if ref in found:
+                continue
+            found.append(ref)
+            if ref.endswith((".tsx", ".tx")):
+                pending.append(ref)
+
+    return found
+
+
+def template_object(path: str, tileset: str, firstgid: int) -> dict | None:
+    """gid, height and int properties of the object in a Tiled template
+
+    pytmx leaves template objects blank. The gid is translated to `firstgid`
+    of the map's tileset, None if the template is missing or uses another.
+    """
+    import xml.etree.ElementTree as ET
+
+    if not os.path.exists(path):
+        return None
+    root = ET.parse(path).getroot()
+    obj = root.find("object")
+    if obj is None:
+        return None
+
+    gid = int(obj.get("gid", 0)) & 0x0FFFFFFF  # without the flip flags
+    source = root.find("tileset")
+    if gid and source is not None:
+        used = os.path.normpath(
+            os.path.join(os.path.dirname(path), source.get("source", ""))
+        )
+        if used != os.path.normpath(tileset):
+            return None
+        gid = gid - int(source.get("firstgid", 1)) + firstgid
+
+    return {
+        "gid": gid,
+        "height": float(obj.get("height", 0)),
+        "properties": {
+            prop.get("name"): int(prop.get("value"))
+            for prop in obj.iter("property")
+            if prop.get("type") == "int"
+        },
+    }
+
+
+def fingerprint(paths: list[str]) -> dict[str, int | None]:
+    # missing files are recorded too, creating them invalidates the cache
+    return {
+        path: os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        for path in paths
+    }
+
+
+class LevelData:
+    """Display-independent contents of a level
+
+    `gids` holds the TMX gid of every "walls" cell (0 is empty), tiles are cut
+    out of the single tileset `atlas`. `sorted_tiles` are the walls sorted
+    for a `TileLayer` with `render.chunk_size` buckets. `sources` is the
+    `fingerprint` of the files it was compiled from.
+    """
+
+    def __init__(
+        self,
+        gids: np.ndarray,
+        atlas: np.ndarray,
+        tile_size: tuple[int, int],
+        columns: int,
+        firstgid: int,
+        collectibles: np.ndarray,
+        objects: list[dict],
+        sorted_tiles: SortedTiles,
+        sources: dict[str, int | None],
+    ) -> None:
+        self.gids = gids
+        self.atlas = atlas
+        self.tile_size = tile_size
+        self.columns = columns
+        self.firstgid = firstgid
+        self.collectibles = collectibles
+        self.objects = objects
+        self.sorted_tiles = sorted_tiles
+        self.sources = sources
+
+        self.atlas_surface: pg.Surface | None = None
+        self.atlas_converted = False
+        self.tiles: dict[int, pg.Surface] = {}
+
+    def atlas_rect(self, gid: int) -> pg.Rect:
+        local = gid - self.firstgid
+        tw, th = self.tile_size
+        return pg.Rect(
+            (local % self.columns) * tw, (local // self.columns) * th, tw, th
+        )
+
+    def decode_atlas(self) -> pg.Surface:
+        """The atlas as a surface, not yet converted
+
+        Left unconverted so it can be built off the main thread.
+        """
+        if self.atlas_surface is None:
+            h, w = self.atlas.shape[:2]
+            self.atlas_surface = pg.image.frombytes(
+                self.atlas.tobytes(), (w, h), "RGBA"
+            )
+        return self.atlas_surface
+
+    def atlas_image(self) -> pg.Surface:
+        surface = self.decode_atlas()
+        if not self.atlas_converted and pg.display.get_surface() is not None:
+            self.atlas_surface = surface.convert_alpha()
+            self.atlas_converted = True
+        return self.atlas_surface
+
+    def tile(self, gid: int) -> pg.Surface:
+        """Atlas subsurface for a TMX gid, shared between every tile using it"""
+        surface = self.tiles.get(gid)
+        if surface is None:
+            surface = self.tiles[gid] = self.atlas_image().subsurface(
+                self.atlas_rect(gid)
+            )
+        return surface
+
+
+def compile_level(name: str) -> LevelData:
+    """Parse the TMX once and write the cache, returns the compiled data"""
+    # only needed when the cache is stale
+    from pytmx import TiledMap
+
+    tmx = level_path(name)
+    map = TiledMap(tmx)
+    sources = dependencies(tmx)
+
+    if len(map.tilesets) != 1:
+        raise ValueError(f"{tmx}: the level cache supports a single tileset")
+    tileset = map.tilesets[0]
+    atlas_path = next(path for path in sources if path.endswith(".png"))
+    atlas = pg.image.load(atlas_path)
+    atlas = np.frombuffer(pg.image.tobytes(atlas, "RGBA"), np.uint8).reshape(
+        atlas.get_height(), atlas.get_width(), 4
+    )
+
+    def tmx_gid(gid: int) -> int:
+        return map.tiledgidmap.get(gid, 0) if gid else 0
+
+    # pytmx renumbers gids, map them back through a lookup table in one go
+    walls = map.get_layer_by_name("walls")
+    lookup = np.zeros(max(map.tiledgidmap, default=0) + 1, np.int32)
+    for gid, tiled in map.tiledgidmap.items():
+        lookup[gid] = tiled
+    gids = lookup[np.array(walls.data, dtype=np.intp)]
+
+    tileset_path = next(path for path in sources if path.endswith(".tsx"))
+    templates: dict[str, dict | None] = {}
+
+    def collectible(obj) -> tuple[float, float, int, int]:
+        template = None
+        if obj.template and not obj.gid:
+            template = templates.get(obj.template)
+            if obj.template not in templates:
+                template = templates[obj.template] = template_object(
+                    os.path.join(os.path.dirname(tmx), obj.template),
+                    tileset_path,
+                    tileset.firstgid,
+                )
+        if template is None:
+            return obj.x, obj.y, tmx_gid(obj.gid), obj.properties.get("value", 1)
+
+        # tile objects are placed by their bottom left corner
+        y = obj.y - template["height"] if template["gid"] else obj.y
+        value = obj.properties.get("value", template["properties"].get("value", 1))
+        return obj.x, y, template["gid"], value
+
+    collectibles = np.array(
+        [collectible(obj) for obj in map.get_layer_by_name("collectibles")],
+        dtype=collectible_dtype,
+    )
+    objects = [
+        {"name": obj.name, "x": obj.x, "y": obj.y}
+        for obj in map.get_layer_by_name("objects")
+    ]
+
+    tile_size = (map.tilewidth, map.tileheight)
+    bucket_size = settings["render"]["chunk_size"]
+    tiles = sort_tiles(gids, tile_size, bucket_size)
+
+    mtimes = fingerprint(sources)
+    path = cache_path(name)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "gids.npy"), gids)
+    np.save(os.path.join(path, "tiles.npy"), np.stack(tiles[:3]))
+    np.save(os.path.join(path, "buckets.npy"), tiles.buckets)
+    np.save(os.path.join(path, "atlas.npy"), atlas)
+    np.save(os.path.join(path, "collectibles.npy"), collectibles)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "sources": mtimes,
+        "tile_size": list(tile_size),
+        "bucket_size": bucket_size,
+        "columns": tileset.columns,
+        "firstgid": tileset.firstgid,
+        "objects": objects,
+    }
+    # written last, a partially written cache is never considered fresh
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    return LevelData(
+        gids,
+        atlas,
+        tile_size,
+        tileset.columns,
+        tileset.firstgid,
+        collectibles,
+        objects,
+        tiles,
+        mtimes,
+    )
+
+
+def load_cached(name: str) -> LevelData | None:
+    """Memory-mapped cache contents, None if missing or stale"""
+    path = cache_path(name)
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    if fingerprint(list(meta["sources"])) != meta["sources"]:
+        return None
+    if level_path(name) not in meta["sources"]:
+        return None
+    if meta["bucket_size"] != settings["render"]["chunk_size"]:
+        return None
+
+    try:
+        x, y, gid = np.load(os.path.join(path, "tiles.npy"), mmap_mode="r")
+        return LevelData(
+            np.load(os.path.join(path, "gids.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "atlas.npy"), mmap_mode="r"),
+            tuple(meta["tile_size"]),
+            meta["columns"],
+            meta["firstgid"],
+            np.load(os.path.join(path, "collectibles.npy")),
+            meta["objects"],
+            SortedTiles(x, y, gid, np.load(os.path.join(path, "buckets.npy"))),
+            meta["sources"],
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def refresh_cache(name: str) -> bool:
+    """Compile the level unless its cache is fresh, returns whether it compiled
+
+    Returns nothing else so it can run in another process.
+    """
+    if load_cached(name) is not None:
+        return False
+    compile_level(name)
+    return True
+
+
+def load_level_data(name: str) -> LevelData:
+    return load_cached(name) or compile_level(name)
@@ -3,8 +3,8 @@ from ..settings import *
 
 
 class DevLevel(Level):
-    def __init__(self, game) -> None:
-        super().__init__(game, "dev")
+    def __init__(self, game, staged: bool = False) -> None:
+        super().__init__(game, "dev", staged=staged)
         from ..main import Game
 
         self.game: Game = game
@@ -18,21 +18,21 @@ class DevLevel(Level):
     def fixed_update(self, dt: float):
         super().fixed_update(dt)
 
-    def draw(self, target: pg.Surface):
-        super().draw(target)
+    def draw_background(self, target: pg.Surface):
+        super().draw_background(target)
 
         # ? draw origin
         pg.draw.line(
             target,
             pg.Color(80, 80, 86),
-            vector(0, display_height - self.camera.scroll.y),
-            vector(display_width, display_height - self.camera.scroll.y),
+            vector(0, display_height - self.camera.view.y),
+            vector(display_width, display_height - self.camera.view.y),
         )
 
         pg.draw.line(
             target,
             pg.Color(80, 80, 86),
-            vector(-self.camera.scroll.x, 0),
-            vector(-self.camera.scroll.x, display_height),
+            vector(-self.camera.view.x, 0),
+            vector(-self.camera.view.x, display_height),
         )
         # ? end draw origin
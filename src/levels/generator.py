@@ -0,0 +1,127 @@
+import base64
+import os
+import zlib
+
+import numpy as np
+
+from ..settings import *
+from .cache import level_path
+
+TILESET = "assets/levels/tileset.tsx"
+TEMPLATES = {"coin": "assets/templates/coin.tx", "gem": "assets/templates/gem.tx"}
+
+# gids of the dev level's tiles, in `tileset.tsx`
+CORNER, TOP, LEFT, RIGHT = 123, 143, 124, 122
+PLATFORM_LEFT, PLATFORM, PLATFORM_RIGHT = 2, 3, 4
+GROUND, FILL = 23, 105
+
+
+def generate_gids(
+    width: int, height: int, density: float, rng: np.random.Generator
+) -> np.ndarray:
+    """Framed room with a floor and random platforms over `density` of the inside"""
+    gids = np.zeros((height, width), np.uint32)
+    gids[0] = TOP
+    gids[:, 0] = LEFT
+    gids[:, -1] = RIGHT
+    gids[-2] = GROUND
+    gids[-1] = FILL
+    gids[[0, 0, -2, -2], [0, -1, 0, -1]] = CORNER
+
+    # platforms 3 to 8 tiles long, over the rows between the ceiling and the
+    # floor with a gap under the ceiling so nothing spawns stuck in it
+    inside = max(width - 2, 0) * max(height - 5, 0)
+    count = int(inside * density / 5.5)
+    if count == 0 or width < 5:
+        return gids
+
+    lengths = rng.integers(3, 9, count)
+    lengths = np.minimum(lengths, width - 2)
+    rows = rng.integers(3, height - 2, count)
+    left = rng.integers(1, width - lengths)
+
+    # every tile of every platform in one go
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    columns = np.repeat(left, lengths) + np.arange(lengths.sum()) - starts
+    gids[np.repeat(rows, lengths), columns] = PLATFORM
+    gids[rows, left] = PLATFORM_LEFT
+    gids[rows, left + lengths - 1] = PLATFORM_RIGHT
+    return gids
+
+
+def generate_collectibles(
+    gids: np.ndarray, count: int, gem_chance: float, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Grid x and y above random platform or floor tiles, and whether each is a gem"""
+    below = gids[1:] != 0
+    free = gids[:-1] == 0
+    rows, columns = np.nonzero(below & free)
+    if not len(rows):
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.bool_)
+    pick = rng.integers(0, len(rows), count)
+    return columns[pick], rows[pick], rng.random(count) < gem_chance
+
+
+def generate_level(
+    name: str,
+    width: int,
+    height: int,
+    density: float = 0.1,
+    collectibles: int = 100,
+    gem_chance: float = 0.2,
+    seed: int = 0,
+) -> str:
+    """Write a TMX level at `level_path(name)`, returns its path
+
+    The layout matches dev.tmx: a "walls" tile layer from `tileset.tsx`, an
+    "objects" group with the player and a "collectibles" group of coin and
+    gem templates. The same arguments always write the same file.
+    """
+    rng = np.random.default_rng(seed)
+    gids = generate_gids(width, height, density, rng)
+    xs, ys, gems = generate_collectibles(gids, collectibles, gem_chance, rng)
+
+    path = level_path(name)
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    tileset = os.path.relpath(TILESET, folder).replace(os.sep, "/")
+    templates = {
+        kind: os.path.relpath(template, folder).replace(os.sep, "/")
+        for kind, template in TEMPLATES.items()
+    }
+
+    tw = th = TILE_SIZE
+    data = base64.b64encode(zlib.compress(gids.astype("<u4").tobytes(), 6)).decode()
+    # tile objects are placed by their bottom left corner
+    objects = "\n".join(
+        f'  <object id="{i + 2}" template="{templates["gem" if gem else "coin"]}"'
+        f' x="{x * tw}" y="{(y + 1) * th}"/>'
+        for i, (x, y, gem) in enumerate(zip(xs.tolist(), ys.tolist(), gems.tolist()))
+    )
+    spawn_y = (height - 2) * th - 44
+
+    with open(path, "w") as f:
+        f.write(
+            f"""<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.10" tiledversion="1.10.2" orientation="orthogonal"
+     renderorder="right-down" width="{width}" height="{height}"
+     tilewidth="{tw}" tileheight="{th}" infinite="0" nextlayerid="4"
+     nextobjectid="{len(xs) + 2}">
+ <tileset firstgid="1" source="{tileset}"/>
+ <layer id="1" name="walls" width="{width}" height="{height}">
+  <data encoding="base64" compression="zlib">
+   {data}
+  </data>
+ </layer>
+ <objectgroup id="2" name="objects">
+  <object id="1" name="player" x="48" y="{spawn_y}">
+   <point/>
+  </object>
+ </objectgroup>
+ <objectgroup id="3" name="collectibles">
+{objects}
+ </objectgroup>
+</map>
+"""
+        )
+    return path
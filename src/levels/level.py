@@ -1,61 +1,234 @@
+from collections.abc import Iterator
+
+import numpy as np
+
 from ..settings import *
 from ..player import Player
 from ..camera import Camera
-from ..tiles import Wall, Collectible
-from pytmx.util_pygame import load_pygame
+from ..collision import TileGrid
+from ..chunks import ChunkRenderer
+from .streaming import LevelStreamer
+from .snapshot import LevelSnapshot, SnapshotRing
+from ..animation import AnimationClock
+from ..tiles import TileLayer
+from ..entities import EntityStore
+from ..particles import ParticleSystem
+from ..profiler import profiler
+from ..assets import assets
+from .cache import LevelData
 
 
 class Level:
-    def __init__(self, game, name: str) -> None:
+    def __init__(
+        self,
+        game,
+        name: str,
+        streaming: bool | None = None,
+        render: bool = True,
+        staged: bool = False,
+    ) -> None:
         from ..main import Game
 
         self.game: Game = game
         self.name = name
+        self.streaming = streaming
+        # physics only, no walls or sprites are built, see `Simulation`
+        self.render = render
 
-        self.walls = []
-        self.collectibles = []
+        self.walls: TileLayer | None = None
+        self.collectibles = EntityStore()
+        self.tile_grid: TileGrid | None = None
+        self.wall_renderer: ChunkRenderer | None = None
+        self.streamer: LevelStreamer | None = None
         self.player: Player | None = None
-        self.load()
+        self.animation_clock = AnimationClock()
+        self.particles = ParticleSystem() if render else None
+        self.data: LevelData | None = None
 
         self.camera = Camera()
-        self.camera.follow = self.player.rect
+        # the dirty renderer's background is only valid at whole-pixel positions
+        self.camera.snap = game.dirty is not None
+        self.warm_rect = pg.FRect(0, 0, 0, 0)
+
+        # retry goes back to `start`, rewinding steps through `checkpoints`
+        self.start: LevelSnapshot | None = None
+        self.checkpoints = SnapshotRing(settings["snapshots"]["capacity"])
+        self.checkpoint_interval = settings["snapshots"]["interval"]
+        self.ticks = 0
+
+        # staged levels are built a step at a time by `SceneManager`
+        self.loading = self.load_steps()
+        if not staged:
+            self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self.start is not None
 
     def load(self):
-        map = load_pygame(f"assets/levels/{self.name}.tmx")
-        for x, y, surf in map.get_layer_by_name("walls").tiles():
-            self.walls.append(Wall(x, y, surf))
-
-        for obj in map.get_layer_by_name("collectibles"):
-            print(obj, obj.x, obj.y, obj.image, obj.properties)
-            self.collectibles.append(
-                Collectible(
-                    obj.x,
-                    obj.y,
-                    obj.image or pg.Surface((16, 16)),
-                    obj.properties.get("value", 1),
+        """Run whatever is left of `load_steps`"""
+        for _ in self.loading:
+            pass
+
+    def load_steps(self) -> Iterator[None]:
+        """Build the level, yielding between steps that each take a bounded time"""
+        data = self.data = assets.level(self.name)
+
+        if not self.render:
+            self.streaming = False
+        elif self.streaming is None:
+            self.streaming = (
+                settings["streaming"]["enabled"]
+                or data.gids.size >= settings["streaming"]["min_tiles"]
+            )
+
+        if self.streaming:
+            # walls arrive chunk by chunk, see `LevelStreamer`
+            self.tile_grid = TileGrid(
+                np.zeros(data.gids.shape, np.uint8), data.tile_size[0]
+            )
+            self.wall_renderer = self.streamer = LevelStreamer(data, self.tile_grid)
+        else:
+            # a band of rows per step, reading the mapped gids grows with the map
+            rows, columns = data.gids.shape
+            solid = np.empty((rows, columns), np.uint8)
+            band = max(65536 // max(columns, 1), 1)
+            for row in range(0, rows, band):
+                np.not_equal(
+                    data.gids[row : row + band],
+                    0,
+                    out=solid[row : row + band].view(np.bool_),
                 )
+                yield
+            self.tile_grid = TileGrid(solid, data.tile_size[0])
+            if self.render:
+                # sorted when the cache was compiled, only the bucket grid is built here
+                self.walls = TileLayer(
+                    data.gids,
+                    data.tile_size,
+                    data.atlas_image(),
+                    data.atlas_rect,
+                    tiles=data.sorted_tiles,
+                )
+                self.wall_renderer = ChunkRenderer(self.walls)
+        yield
+
+        placeholder = pg.Surface((16, 16))
+        records = data.collectibles
+        for gid in np.unique(records["gid"]).tolist():
+            batch = records[records["gid"] == gid]
+            self.collectibles.add_many(
+                batch["x"],
+                batch["y"],
+                data.tile(gid) if gid else placeholder,
+                batch["value"],
             )
+        yield
+
+        for obj in data.objects:
+            if obj["name"] == "player":
+                self.player = Player(self, obj["x"], obj["y"])
+        self.camera.follow = self.player.render_rect
+        self.camera.center(display_size)
+        yield
 
-        for obj in map.get_layer_by_name("objects"):
-            print(obj)
-            if obj.name == "player":
-                self.player = Player(self, obj.x, obj.y)
+        if self.streamer:
+            # the first frame only waits for the spawn chunk
+            self.streamer.load_now(self.player.rect)
+            self.streamer.require(self.player.rect)
+        elif self.wall_renderer:
+            # bake what the first frame shows, a chunk per step
+            self.warm_rect.update(self.camera.view, display_size)
+            for _ in self.wall_renderer.keys(self.warm_rect):
+                self.wall_renderer.warm(self.warm_rect)
+                yield
+
+        self.start = self.snapshot()
+
+    def close(self):
+        """Hand back what the level holds outside itself"""
+        if self.streamer:
+            self.streamer.close()
+        if self.data is not None:
+            assets.release(self.data)
+            self.data = None
+
+    def snapshot(self) -> LevelSnapshot:
+        return LevelSnapshot(
+            self.player.snapshot(),
+            self.collectibles.snapshot(),
+            tuple(self.camera.scroll),
+        )
+
+    def restore(self, snapshot: LevelSnapshot):
+        self.player.restore(snapshot.player)
+        self.collectibles.restore(snapshot.collectibles)
+        self.camera.scroll.update(snapshot.scroll)
+        if self.particles is not None:
+            self.particles.count = 0
+        if self.streamer:
+            self.streamer.require(self.player.hit_rect)
+
+    def retry(self):
+        self.restore(self.start)
+        self.checkpoints.clear()
+
+    def rewind(self, steps: int = 1):
+        """Back to the checkpoint `steps` back, or the start without one"""
+        self.restore(self.checkpoints.rewind(steps) or self.start)
 
     def handle_events(self, events: list[pg.Event]):
+        if self.game.input_state.retry:
+            self.retry()
         self.player.handle_events(events)
 
     def update(self, dt: float):
-        self.player.update(dt, self.walls, self.collectibles)
+        if self.game.show_hud:
+            self.game.scheduler.submit("player.debug", self.player.update, dt)
+        if self.particles is not None:
+            self.particles.update(dt)
+        if self.streamer:
+            self.streamer.update(
+                self.player.hit_rect, self.player.velocity, display_size
+            )
 
     def fixed_update(self, dt: float):
-        self.player.fixed_update(dt)
+        if self.streamer:
+            self.streamer.require(self.player.hit_rect)
+        self.player.fixed_update(dt, self.tile_grid, self.collectibles)
 
-    def draw(self, target: pg.Surface):
+        self.ticks += 1
+        if self.ticks % self.checkpoint_interval == 0 and self.player.is_grounded:
+            self.checkpoints.push(self.snapshot())
+
+    def warm(self):
+        """Bake one chunk in the ring just outside the view, when there is time"""
+        size = self.wall_renderer.chunk_size
+        self.warm_rect.update(self.camera.view, display_size)
+        self.warm_rect.inflate_ip(size * 2, size * 2)
+        self.wall_renderer.warm(self.warm_rect)
+
+    def prepare_draw(self, target: pg.Surface):
+        self.player.interpolate(self.game.alpha)
+        self.animation_clock.update(self.game.now)
         self.camera.update(target, self.game.dt)
 
-        [tile.draw(target, self.camera.scroll) for tile in self.walls]
-        [
-            collectible.draw(target, self.camera.scroll)
-            for collectible in self.collectibles
-        ]
-        self.player.draw(target, self.camera.scroll)
+    def draw_background(self, target: pg.Surface):
+        """What only changes when the camera moves"""
+        with profiler.span("level.walls"):
+            self.wall_renderer.draw(target, self.camera.view)
+
+    def draw_sprites(self, target: pg.Surface, dirty: list[pg.Rect] | None = None):
+        """What changes every frame, adding the rects drawn to `dirty` if given"""
+        view = self.camera.view
+        with profiler.span("level.collectibles"):
+            self.collectibles.draw(target, view, self.game.now, dirty)
+        with profiler.span("level.particles"):
+            self.particles.draw(target, view, dirty)
+        with profiler.span("level.player"):
+            self.player.draw(target, view, dirty)
+
+    def draw(self, target: pg.Surface):
+        self.prepare_draw(target)
+        self.draw_background(target)
+        self.draw_sprites(target)
@@ -0,0 +1,61 @@
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PlayerState(NamedTuple):
+    x: float  # hit rect
+    y: float
+    old_x: float
+    old_y: float
+    vx: float
+    vy: float
+    jump: bool
+    jump_counter: int
+    jump_age: float  # sim seconds since the last jump, the clock itself isn't restored
+    is_grounded: bool
+    wall_contact: int
+    flipped: bool
+    score: int
+
+
+class LevelSnapshot(NamedTuple):
+    """Everything in a `Level` that changes while playing
+
+    Plain values and packed copies of the live collectible columns, so taking
+    one and restoring it is a few small copies, never a reload.
+    """
+
+    player: PlayerState
+    collectibles: tuple[np.ndarray, ...]
+    scroll: tuple[float, float]
+
+
+class SnapshotRing:
+    """The last `capacity` snapshots, for checkpoints and rewinding"""
+
+    def __init__(self, capacity: int) -> None:
+        self.snapshots: deque[LevelSnapshot] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def push(self, snapshot: LevelSnapshot):
+        self.snapshots.append(snapshot)
+
+    def latest(self) -> LevelSnapshot | None:
+        return self.snapshots[-1] if self.snapshots else None
+
+    def rewind(self, steps: int = 1) -> LevelSnapshot | None:
+        """Drop the newest `steps - 1` snapshots and return the one after them
+
+        The returned snapshot stays in the ring, so rewinding again from there
+        lands on the same point.
+        """
+        for _ in range(min(steps - 1, len(self.snapshots) - 1)):
+            self.snapshots.pop()
+        return self.latest()
+
+    def clear(self):
+        self.snapshots.clear()
@@ -0,0 +1,160 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from ..settings import *
+from ..chunks import ChunkRenderer
+from ..collision import TileGrid
+from .cache import LevelData
+
+
+class LevelStreamer(ChunkRenderer):
+    """Loads the wall layer chunk by chunk around the player
+
+    Chunk surfaces are baked straight from the memory-mapped gid grid on a
+    background thread, prefetched `radius` chunks around the viewport plus
+    `ahead` chunks in the direction of travel, and evicted through the
+    `ChunkRenderer` LRU once over `budget` bytes.
+
+    Collision data is one byte per tile, so it is copied into the level's
+    `TileGrid` as chunks arrive and kept; `require` fills it synchronously
+    for chunks the player reaches before their surface is ready.
+    """
+
+    def __init__(
+        self,
+        data: LevelData,
+        grid: TileGrid,
+        radius: int = settings["streaming"]["radius"],
+        ahead: int = settings["streaming"]["ahead"],
+        budget: int = settings["streaming"]["budget"],
+    ) -> None:
+        super().__init__(None, budget=budget)
+        self.data = data
+        self.grid = grid
+        self.radius = radius
+        self.ahead = ahead
+
+        self.atlas = data.atlas_image()
+        self.atlas_rects = {}
+        self.occupied: set[tuple[int, int]] = set()
+        self.pending: dict[tuple[int, int], Future] = {}
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="streaming")
+
+    def tile_range(self, key: tuple[int, int]) -> tuple[slice, slice]:
+        size = self.chunk_size
+        tw, th = self.data.tile_size
+        rows, columns = self.data.gids.shape
+        return (
+            slice(
+                max(key[1] * size // th, 0),
+                min(-(-(key[1] + 1) * size // th), rows),
+            ),
+            slice(
+                max(key[0] * size // tw, 0),
+                min(-(-(key[0] + 1) * size // tw), columns),
+            ),
+        )
+
+    def occupy(self, key: tuple[int, int], gids: np.ndarray | None = None):
+        if key in self.occupied:
+            return
+        rows, columns = self.tile_range(key)
+        if gids is None:
+            gids = self.data.gids[rows, columns]
+        self.grid.solid[rows, columns] = gids != 0
+        self.occupied.add(key)
+
+    def load(self, key: tuple[int, int]) -> tuple[pg.Surface, np.ndarray]:
+        """Read and bake one chunk, runs on the worker thread"""
+        size = self.chunk_size
+        tw, th = self.data.tile_size
+        rows, columns = self.tile_range(key)
+        gids = np.array(self.data.gids[rows, columns])
+
+        surface = pg.Surface((size, size), pg.SRCALPHA)
+        ox = columns.start * tw - key[0] * size
+        oy = rows.start * th - key[1] * size
+        blits = []
+        for y, x in zip(*np.nonzero(gids)):
+            gid = int(gids[y, x])
+            area = self.atlas_rects.get(gid)
+            if area is None:
+                area = self.atlas_rects[gid] = self.data.atlas_rect(gid)
+            blits.append((self.atlas, (ox + int(x) * tw, oy + int(y) * th), area))
+        surface.blits(blits, doreturn=False)
+
+        return surface, gids
+
+    def bake(self, key: tuple[int, int]) -> pg.Surface:
+        surface, gids = self.load(key)
+        self.occupy(key, gids)
+        return surface
+
+    def in_bounds(self, key: tuple[int, int]) -> bool:
+        rows, columns = self.tile_range(key)
+        return rows.start < rows.stop and columns.start < columns.stop
+
+    def request(self, key: tuple[int, int]):
+        if key in self.chunks or key in self.pending or not self.in_bounds(key):
+            return
+        self.pending[key] = self.executor.submit(self.load, key)
+
+    def load_now(self, rect: pg.Rect | pg.FRect):
+        """Bake every chunk under `rect` on this thread, for the spawn point"""
+        for key in self.keys(rect):
+            if key not in self.chunks and self.in_bounds(key):
+                self.pending.pop(key, None)
+                self.chunks[key] = self.bake(key)
+                self.last_seen[key] = self.frame
+                self.installed += 1
+
+    def require(self, rect: pg.Rect | pg.FRect):
+        """Make sure collision data exists around `rect`"""
+        size = self.chunk_size
+        for key in self.keys(rect.inflate(size * 2, size * 2)):
+            self.occupy(key)
+
+    def update(
+        self, focus: pg.Rect | pg.FRect, velocity: vector, view: tuple[int, int]
+    ):
+        # install chunks the worker finished
+        for key, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[key]
+            surface, gids = future.result()
+            self.occupy(key, gids)
+            self.chunks[key] = surface
+            self.last_seen[key] = self.frame
+            self.installed += 1
+
+        # viewport sized area around the focus, stretched towards travel
+        size = self.chunk_size
+        area = pg.FRect((0, 0), view).inflate(
+            self.radius * size * 2, self.radius * size * 2
+        )
+        area.center = focus.center
+        if velocity.x:
+            area.w += self.ahead * size
+            if velocity.x < 0:
+                area.x -= self.ahead * size
+        if velocity.y:
+            area.h += self.ahead * size
+            if velocity.y < 0:
+                area.y -= self.ahead * size
+
+        for key in self.keys(area):
+            self.request(key)
+
+    def get(self, key: tuple[int, int]) -> pg.Surface | None:
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            self.request(key)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
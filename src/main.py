@@ -1,18 +1,47 @@
+import os
+import random
 import time
 
 
-from .hud import Hud
+from .profiler import profiler
+from .assets import assets
+from .scheduler import FrameScheduler
+from .present import create_presenter
+from .dirty import DirtyRenderer
+from .input import InputState, KeyboardInput
+from .replay import Recording
+from .scenes import SceneManager
 from .settings import *
-from .levels.dev_level import DevLevel
+from .levels.level import Level
 
 
 class Game:
-    pg.init()
-
-    def __init__(self, vsync=False) -> None:
+    def __init__(
+        self,
+        vsync=False,
+        level: str = "dev",
+        seed: int = 0,
+        record: str | None = None,
+        present: str = settings["display"]["present"],
+        dirty: bool = settings["display"]["dirty_rects"],
+    ) -> None:
+        self.seed = seed
+        random.seed(seed)
+
+        # only what the game uses, `pg.init` would also bring up audio and joysticks
+        pg.display.init()
         self.window_size = (settings["display"]["width"], settings["display"]["height"])
-        self.window = pg.display.set_mode(self.window_size, vsync=vsync)
-        self.target = pg.Surface(display_size)
+        self.presenter = create_presenter(
+            present, self.window_size, display_size, vsync
+        )
+        # 32-bit whatever the display's depth, particles write its pixels directly
+        self.target = pg.Surface(display_size, depth=32)
+        self.clear_color = pg.Color(26, 26, 32)
+
+        # rects of the target / window that changed this frame, None for all
+        self.dirty = DirtyRenderer(display_size, self.clear_color) if dirty else None
+        self.dirty_rects: list[pg.Rect] | None = None
+        self.presented: list[pg.Rect] | None = None
 
         self.clock = pg.time.Clock()
         self.target_fps = settings["display"]["target_fps"]
@@ -21,62 +50,164 @@ class Game:
         self.dt = 0
         self.prev_time = 0
 
-        self.last_fixed_update_at = 0
-        self.fixed_update_rate = 1 / 50
+        # physics runs in fixed steps, rendering interpolates between them
+        self.fixed_dt = 1 / settings["physics"]["tick_rate"]
+        self.max_fixed_steps = settings["physics"]["max_ticks_per_frame"]
+        self.accumulator = 0
+        self.sim_time = 0
+        self.alpha = 0
 
         self.running = True
 
-        self.hud = Hud(self)
+        # input, physics and the world draw run every frame, the rest in leftover time
+        self.scheduler = FrameScheduler()
+
+        self.input = KeyboardInput()
+        self.input_state = InputState()
+        self.record_path = record
+        self.recording = Recording(level, seed) if record else None
+
+        # created the first time debug is toggled on
+        self.hud = None
+        self.show_hud = False
 
-        self.level = DevLevel(self)
+        self.level: Level | None = None
+        self.scenes = SceneManager(self)
+        self.scenes.load(level)
 
+    @profiler.profile("events")
     def handle_events(self):
         events = pg.event.get()
 
         for e in events:
-            if e.type == pg.QUIT:
+            # SDL only quits once the last window closes, the renderer
+            # backend keeps a hidden one besides the one that gets closed
+            if e.type in (pg.QUIT, pg.WINDOWCLOSE):
                 self.running = False
             if e.type == pg.KEYDOWN:
                 if e.key == pg.K_ESCAPE:  # !temp
                     self.running = False
-
+                if e.key == settings["keybinds"]["misc"]["profiler"]:
+                    profiler.toggle()
+                    if profiler.enabled and not self.show_hud:
+                        self.toggle_hud()
+                if e.key == settings["keybinds"]["misc"]["export"]:
+                    os.makedirs("profiles", exist_ok=True)
+                    profiler.export(f"profiles/{time.strftime('%Y%m%d-%H%M%S')}.csv")
+
+        self.input_state = self.input.read(events)
+        if self.recording is not None:
+            self.recording.capture(self.input_state)
+        if self.input_state.debug:
+            self.toggle_hud()
         self.level.handle_events(events)
 
+    def toggle_hud(self):
+        if self.hud is None:
+            from .hud import Hud
+
+            self.hud = Hud(self)
+        self.show_hud = not self.show_hud
+
     def update_dt(self):
-        self.now = time.time()
+        self.now = time.perf_counter()
         self.dt = self.now - self.prev_time
         self.prev_time = self.now
 
+    @profiler.profile("update")
     def update(self):
+        if self.scenes.switch_pending:
+            self.scenes.switch()
         self.level.update(self.dt)
 
-    def fixed_update(self):
-        if not self.now - self.last_fixed_update_at > self.fixed_update_rate:
-            return
-        self.last_fixed_update_at = self.now
+        scheduler = self.scheduler
+        scheduler.submit("assets", assets.poll, priority=2)
+        if self.scenes.next_name is not None and not self.scenes.ready:
+            scheduler.submit("scenes", self.scenes.update, priority=1)
+        scheduler.submit("chunks", self.level.warm, priority=1)
+        if self.show_hud:
+            scheduler.submit("hud", self.hud.update, self.dt)
 
-        self.level.fixed_update(self.dt)
-        self.hud.update(self.dt)
+    def fixed_update(self):
+        if self.recording is not None:
+            self.recording.tick()
+        self.level.fixed_update(self.fixed_dt)
+        self.sim_time += self.fixed_dt
+
+    @profiler.profile("physics")
+    def step(self):
+        """Run as many fixed ticks as the frame time covers"""
+        self.accumulator += self.dt
+
+        steps = 0
+        while self.accumulator >= self.fixed_dt:
+            if steps == self.max_fixed_steps:
+                # too far behind, drop the backlog instead of spiraling
+                self.accumulator %= self.fixed_dt
+                break
+            self.fixed_update()
+            self.accumulator -= self.fixed_dt
+            steps += 1
 
-    def draw(self):
-        self.target.fill(pg.Color(26, 26, 32))
-        pg.display.set_caption(f"{self.clock.get_fps():.1f}")
+        self.alpha = self.accumulator / self.fixed_dt
 
-        self.level.draw(self.target)
+    @profiler.profile("world")
+    def draw_world(self):
+        self.presenter.set_caption(f"{self.clock.get_fps():.1f}")
 
-        pg.transform.scale(self.target, self.window_size, self.window)
+        if self.dirty is not None:
+            self.dirty_rects = self.dirty.draw(self.level, self.target)
+            return
 
-        self.hud.draw(self.window)
+        self.target.fill(self.clear_color)
+        self.level.draw(self.target)
 
-        pg.display.update()
+    @profiler.profile("present")
+    def present(self):
+        self.presented = self.presenter.present(self.target, self.dirty_rects)
+
+    @profiler.profile("deferred")
+    def run_deferred(self):
+        self.scheduler.run()
+
+    @profiler.profile("hud")
+    def draw_hud(self):
+        if self.show_hud:
+            rects = self.hud.draw(self.presenter.overlay())
+            self.presenter.overlay_drawn(rects)
+            if self.presented is not None:
+                self.presented += rects
+
+    @profiler.profile("flip")
+    def flip(self):
+        self.presenter.flip(self.presented)
         self.clock.tick(self.target_fps)
 
+    def draw(self):
+        self.draw_world()
+        self.present()
+        self.run_deferred()
+        self.draw_hud()
+        self.flip()
+
     def run(self):
-        self.prev_time = time.time()  # avoids out of world dt on first frame
+        self.prev_time = time.perf_counter()  # avoids out of world dt on first frame
 
         while self.running:
+            self.scheduler.begin_frame(self.target_fps)
             self.handle_events()
             self.update_dt()
             self.update()
-            self.fixed_update()
+            self.step()
             self.draw()
+            profiler.end_frame()
+
+        self.stop_recording()
+
+    def stop_recording(self):
+        """Save the recording, which only covers the level it started on"""
+        if self.recording is None:
+            return
+        self.recording.finish(self.level.player)
+        self.recording.save(self.record_path)
+        self.recording = None
@@ -0,0 +1,209 @@
+import numpy as np
+
+from .settings import *
+
+# colors a particle steps through over its life, and its size in pixels
+KINDS = {
+    "dust": ([(210, 205, 195), (160, 155, 150), (110, 108, 110), (70, 70, 78)], 2),
+    "spark": ([(255, 240, 140), (255, 200, 0), (230, 140, 20), (140, 70, 20)], 2),
+    "impact": ([(230, 230, 240), (150, 150, 170), (80, 80, 96)], 1),
+}
+
+
+class ParticleSystem:
+    """Struct-of-arrays particles, integrated, culled and drawn in whole-array steps
+
+    Live particles are packed in `[0, count)` like `EntityStore`. Every kind owns
+    a run of sprites (a color and a square size) that its particles step
+    through as they age, so fading is an index rather than a surface per
+    particle. Emitting into a full system drops the new particles.
+
+    Particles are a few pixels each, so `draw` scatters them straight into the
+    target's pixel array; a blit per particle costs more than the budget
+    allows at tens of thousands.
+    """
+
+    def __init__(self, capacity: int = settings["particles"]["capacity"]) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.age = np.zeros(capacity, np.float32)
+        self.life = np.ones(capacity, np.float32)
+        self.sprite = np.zeros(capacity, np.int32)  # first sprite of the kind
+        self.frames = np.ones(capacity, np.int32)  # sprites in the kind
+
+        # scratch space, so updating and culling allocate nothing per particle
+        self.scratch_float = np.zeros(capacity, np.float32)
+        self.scratch_x = np.zeros(capacity, np.int32)
+        self.scratch_y = np.zeros(capacity, np.int32)
+        self.scratch_mask = np.zeros(capacity, np.bool_)
+        self.scratch_test = np.zeros(capacity, np.bool_)
+
+        self.colors: list[tuple[int, int, int]] = []
+        self.sizes = np.zeros(0, np.int32)
+        self.kinds: dict[str, tuple[int, int]] = {}
+        # `colors` mapped to the pixel format `draw` last drew into
+        self.mapped = np.zeros(0, np.uint32)
+        self.mapped_format: tuple | None = None
+        for name, (colors, size) in KINDS.items():
+            self.add_kind(name, colors, size)
+
+        self.rng = np.random.default_rng()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def columns(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.x,
+            self.y,
+            self.vx,
+            self.vy,
+            self.gravity,
+            self.age,
+            self.life,
+            self.sprite,
+            self.frames,
+        )
+
+    def add_kind(self, name: str, colors: list[tuple[int, int, int]], size: int):
+        self.kinds[name] = (len(self.colors), len(colors))
+        self.colors += colors
+        self.mapped_format = None
+        self.sizes = np.append(self.sizes, [size] * len(colors)).astype(np.int32)
+
+    def emit(
+        self,
+        kind: str,
+        x: float,
+        y: float,
+        count: int,
+        speed: tuple[float, float] = (20, 60),
+        angle: tuple[float, float] = (0, math.tau),
+        life: tuple[float, float] = (0.3, 0.6),
+        gravity: float = 0,
+        spread: float = 0,
+    ):
+        """Spawn `count` particles around (x, y)
+
+        Directions are radians, 0 pointing right and positive angles down.
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+
+        rng = self.rng
+        s = slice(self.count, self.count + count)
+        theta = rng.uniform(*angle, count)
+        velocity = rng.uniform(*speed, count)
+
+        self.x[s] = x + rng.uniform(-spread, spread, count)
+        self.y[s] = y + rng.uniform(-spread, spread, count)
+        self.vx[s] = np.cos(theta) * velocity
+        self.vy[s] = np.sin(theta) * velocity
+        self.gravity[s] = gravity
+        self.age[s] = 0
+        self.life[s] = rng.uniform(*life, count)
+        self.sprite[s], self.frames[s] = self.kinds[kind]
+        self.count += count
+
+    def update(self, dt: float):
+        n = self.count
+        if not n:
+            return
+
+        step = self.scratch_float[:n]
+        self.age[:n] += dt
+        self.vy[:n] += np.multiply(self.gravity[:n], dt, out=step)
+        self.x[:n] += np.multiply(self.vx[:n], dt, out=step)
+        self.y[:n] += np.multiply(self.vy[:n], dt, out=step)
+
+        alive = np.less(self.age[:n], self.life[:n], out=self.scratch_mask[:n])
+        count = int(np.count_nonzero(alive))
+        if count == n:
+            return
+
+        # compact through a scratch array of the column's type
+        for column in self.columns:
+            scratch = (
+                self.scratch_float if column.dtype == np.float32 else self.scratch_x
+            )
+            np.compress(alive, column[:n], out=scratch[:count])
+            column[:count] = scratch[:count]
+        self.count = count
+
+    def map_colors(self, target: pg.Surface) -> np.ndarray:
+        """`colors` as pixel values of `target`, mapped again when its format differs"""
+        pixel_format = (target.get_bitsize(), target.get_masks())
+        if pixel_format != self.mapped_format:
+            self.mapped = np.array(
+                [target.map_rgb(color) for color in self.colors], np.uint32
+            )
+            self.mapped_format = pixel_format
+        return self.mapped
+
+    def draw(
+        self, target: pg.Surface, scroll: vector, dirty: list[pg.Rect] | None = None
+    ):
+        """Draw the visible particles, adding their bounding rect to `dirty` if given"""
+        n = self.count
+        if not n:
+            return
+
+        # whole squares only, a particle overlapping the edge is skipped
+        size = int(self.sizes.max())
+        w, h = target.get_size()
+        x, y = self.scratch_x[:n], self.scratch_y[:n]
+        np.copyto(
+            x, np.subtract(self.x[:n], scroll.x, out=self.scratch_float[:n]), "unsafe"
+        )
+        np.copyto(
+            y, np.subtract(self.y[:n], scroll.y, out=self.scratch_float[:n]), "unsafe"
+        )
+
+        inside, test = self.scratch_mask[:n], self.scratch_test[:n]
+        np.greater_equal(x, 0, out=inside)
+        inside &= np.less_equal(x, w - size, out=test)
+        inside &= np.greater_equal(y, 0, out=test)
+        inside &= np.less_equal(y, h - size, out=test)
+        # only what is on screen is gathered from here on
+        visible = np.flatnonzero(inside)
+        if not len(visible):
+            return
+        if dirty is not None:
+            left, top = int(x[visible].min()), int(y[visible].min())
+            right, bottom = int(x[visible].max()) + size, int(y[visible].max()) + size
+            dirty.append(pg.Rect(left, top, right - left, bottom - top))
+
+        frames = self.frames[visible]
+        step = (self.age[visible] / self.life[visible] * frames).astype(np.int32)
+        sprite = self.sprite[visible] + np.minimum(step, frames - 1)
+        color = self.map_colors(target)[sprite]
+        sizes = self.sizes[sprite]
+
+        if target.get_bytesize() != 4:
+            # the buffer writes below assume 32-bit pixels
+            for px, py, s, c in zip(
+                x[visible].tolist(), y[visible].tolist(), sizes.tolist(), color.tolist()
+            ):
+                target.fill(c, (px, py, s, s))
+            return
+
+        pitch = target.get_pitch() // 4
+        index = y[visible] * pitch + x[visible]
+        buffer = target.get_buffer()  # locks the target until released
+        pixels = np.frombuffer(buffer, np.uint32)
+        pixels[index] = color
+        # grow the larger squares one ring of pixels at a time
+        for ring in range(1, size):
+            larger = np.flatnonzero(sizes > ring)
+            index, color, sizes = index[larger], color[larger], sizes[larger]
+            for d in range(ring + 1):
+                pixels[index + ring * pitch + d] = color
+                pixels[index + d * pitch + ring] = color
+        del pixels, buffer
@@ -1,7 +1,12 @@
 from .settings import *
 from .sprite import Sprite
 from .utils import apply_scroll
-from .tiles import Wall, Collectible
+from .collision import TileGrid
+from .animation import Animation, load_animation, load_masks
+from .assets import assets
+from .profiler import profiler
+from .entities import EntityStore
+from .levels.snapshot import PlayerState
 
 
 class Player(Sprite):
@@ -10,7 +15,6 @@ class Player(Sprite):
         from .levels.level import Level
 
         self.level: Level = level
-        self.hud = self.level.game.hud
 
         self.speed = 140
         self.jump_force = 320
@@ -24,93 +28,121 @@ class Player(Sprite):
         self.jump_cooldown = 1 / 4
         self.last_jump_at = 0
         self.is_grounded = False
+        self.wall_contact = 0
 
         self.image = pg.Surface((32, 32))
         self.image.set_colorkey(Color.BLACK)
         self.rect = self.image.get_frect(topleft=(x, y))
-        self.mask = pg.mask.from_surface(self.image)
         self.hit_rect = self.rect.inflate(-12, -8)
+        self.old_rect = self.hit_rect.copy()
+        self.render_rect = self.rect.copy()
+        self.mask_rect = self.rect.copy()
+
+        # reused every frame by `draw`
+        self.screen_position = vector()
+        self.screen_rect = pg.Rect(0, 0, 0, 0)
 
         self.debug = False
         self.flipped = False
+        self.pixel_perfect = settings["physics"]["pixel_perfect"]
+
+        # only idle is needed for the first frame, the rest load in the background
+        self.frame_size = (int(self.rect.w), int(self.rect.h))
+        self.sprites: dict[str, Animation] = {}
+        self.animation: Animation | None = None
+        if self.level.render:
+            assets.preload(
+                *(
+                    self.sprite_path(name)
+                    for name in ("run", "jump", "double_jump", "fall")
+                )
+            )
+            self.animation = self.sprite("idle")
 
-        self.movement_binds = settings["keybinds"]["movements"]
-
-        self.sprites = {
-            "idle": pg.image.load("assets/player/idle.png").convert_alpha(),
-            "run": pg.image.load("assets/player/run.png").convert_alpha(),
-            "jump": pg.image.load("assets/player/jump.png").convert_alpha(),
-            "double_jump": pg.image.load(
-                "assets/player/double_jump.png"
-            ).convert_alpha(),
-            "fall": pg.image.load("assets/player/fall.png").convert_alpha(),
-        }
-        self.animation_sprite = self.sprites["idle"]
+        self.score = 0
 
-        self.last_frame_at = 0
-        self.frame_interval = 1 / 20
-        self.current_frame = 0
+    def sprite_path(self, name: str) -> str:
+        return f"assets/player/{name}.png"
 
-        self.score = 0
+    def sprite(self, name: str) -> Animation:
+        animation = self.sprites.get(name)
+        if animation is None:
+            animation = self.sprites[name] = load_animation(
+                self.sprite_path(name), self.frame_size
+            )
+        return animation
 
     def handle_events(self, events: list[pg.Event]):
-        keys = pg.key.get_pressed()
-        input_vector = vector(0, 0)
+        state = self.level.game.input_state
 
-        if keys[ord(self.movement_binds["left"])]:
-            input_vector.x -= 1
+        if state.left:
             self.flipped = True
 
-        if keys[ord(self.movement_binds["right"])]:
-            input_vector.x += 1
+        if state.right:
             self.flipped = False
 
-        if keys[ord(self.movement_binds["jump"])]:
+        if state.jump:
             self.jump = True
 
-        if pg.key.get_just_pressed()[settings["keybinds"]["misc"]["debug"]]:
+        if state.debug:
             self.debug = not self.debug
 
-        self.velocity.x = input_vector.normalize().x if input_vector else input_vector.x
+        self.velocity.x = state.right - state.left
+
+    def emit(self, kind: str, x: float, y: float, count: int, **kwargs):
+        # no particles without rendering, see `Simulation`
+        if self.level.particles is not None:
+            self.level.particles.emit(kind, x, y, count, **kwargs)
 
     def land(self):
+        # standing still lands every tick, only falls kick up dust
+        if self.velocity.y > 150:
+            self.emit(
+                "dust",
+                self.hit_rect.centerx,
+                self.hit_rect.bottom,
+                12,
+                speed=(15, 50),
+                angle=(math.pi, math.tau),
+                spread=4,
+                gravity=200,
+            )
         self.jump_counter = 0
         self.is_grounded = True
         if not self.jump:
             self.velocity.y = 0
 
-    def collide(self, walls: list[Wall]):
-        for wall in walls:
-            if not wall.rect.colliderect(self.hit_rect):
-                continue
-
-            if (
-                self.hit_rect.right >= wall.rect.left
-                and self.old_rect.right < wall.old_rect.left + 1
-            ):
-                self.hit_rect.right = wall.rect.left
-            # left
-            elif (
-                self.hit_rect.left <= wall.rect.right
-                and self.old_rect.left > wall.old_rect.right - 1
-            ):
-                self.hit_rect.left = wall.rect.right
+    def collide(self, walls: TileGrid):
+        # resolve one axis at a time, starting from where the tick started
+        x, y = self.hit_rect.topleft
+        self.hit_rect.topleft = self.old_rect.topleft
+
+        self.hit_rect.x = x
+        wall = walls.sweep_x(self.hit_rect, self.old_rect.x)
+        if wall and wall != self.wall_contact:
+            # bounce back off the wall that was just hit
+            edge, back = (
+                (self.hit_rect.right, math.pi) if wall > 0 else (self.hit_rect.left, 0)
+            )
+            self.emit(
+                "impact",
+                edge,
+                self.hit_rect.centery,
+                6,
+                angle=(back - 1, back + 1),
+                spread=3,
+            )
+        self.wall_contact = wall
 
-            # bottom
-            elif (
-                self.hit_rect.bottom >= wall.rect.top
-                and self.old_rect.bottom < wall.old_rect.top + 1
-            ):
-                self.hit_rect.bottom = wall.rect.top
+        self.hit_rect.y = y
+        hit = walls.sweep_y(self.hit_rect, self.old_rect.y)
+        # bottom, unless a jump started this tick
+        if hit > 0:
+            if self.velocity.y >= 0:
                 self.land()
-            # top
-            elif (
-                self.hit_rect.top <= wall.rect.bottom
-                and self.old_rect.top >= wall.old_rect.bottom - 1
-            ):
-                self.hit_rect.top = wall.rect.bottom
-                self.velocity.y = 0
-            # right
+        # top
+        elif hit < 0:
+            self.velocity.y = 0
 
     def move(self, dt: float):
         # horizontal
@@ -129,108 +161,173 @@ class Player(Sprite):
 
         if self.jump:
             if (
-                self.level.game.now - self.last_jump_at > self.jump_cooldown
+                self.level.game.sim_time - self.last_jump_at > self.jump_cooldown
                 and self.jump_counter < self.max_jumps
             ):
                 self.is_grounded = False
                 self.jump_counter += 1
 
                 self.velocity.y = -self.jump_force
-                self.last_jump_at = self.level.game.now
+                self.last_jump_at = self.level.game.sim_time
+                self.emit(
+                    "dust",
+                    self.hit_rect.centerx,
+                    self.hit_rect.bottom,
+                    8,
+                    speed=(10, 40),
+                    angle=(0, math.pi),
+                    spread=4,
+                    gravity=150,
+                )
             self.jump = False
 
-    def collide_collectibles(self, collectibles: list[Collectible] = []):
-        for i, collectible in enumerate(collectibles):
-            if collectible.rect.colliderect(self.hit_rect):
-                collectibles.pop(i)
-                self.score += collectible.value
-
-    def update(
-        self,
-        dt: float = 0,
-        walls: list[Wall] = [],
-        collectibles: list[Collectible] = [],
-    ):
-        self.old_rect = self.hit_rect.copy()
+    def collide_collectibles(self, collectibles: EntityStore):
+        if self.pixel_perfect:
+            self.mask_rect.topleft = (self.hit_rect.x - 6, self.hit_rect.y - 8)
+            score = collectibles.collect(self.mask_rect, self.pose_mask())
+        else:
+            score = collectibles.collect(self.hit_rect)
+        if score:
+            self.score += score
+            self.emit(
+                "spark",
+                *self.hit_rect.center,
+                16 + min(score, 48),
+                speed=(40, 110),
+                life=(0.3, 0.7),
+                gravity=300,
+            )
 
-        self.move(dt)
-        self.collide(walls)
-        self.collide_collectibles(collectibles)
+    def snapshot(self) -> PlayerState:
+        return PlayerState(
+            self.hit_rect.x,
+            self.hit_rect.y,
+            self.old_rect.x,
+            self.old_rect.y,
+            self.velocity.x,
+            self.velocity.y,
+            self.jump,
+            self.jump_counter,
+            self.level.game.sim_time - self.last_jump_at,
+            self.is_grounded,
+            self.wall_contact,
+            self.flipped,
+            self.score,
+        )
 
-        self.hit_rect.y = int(self.hit_rect.y)
-        self.rect.topleft = (
-            self.hit_rect.x - 6,
-            self.hit_rect.y - 8,
-        )  # adjust based on rect inflation
+    def restore(self, state: PlayerState):
+        self.hit_rect.topleft = (state.x, state.y)
+        self.old_rect.topleft = (state.old_x, state.old_y)
+        self.rect.topleft = (state.x - 6, state.y - 8)
+        self.render_rect.topleft = self.rect.topleft
+        self.velocity.update(state.vx, state.vy)
+        self.jump = state.jump
+        self.jump_counter = state.jump_counter
+        self.last_jump_at = self.level.game.sim_time - state.jump_age
+        self.is_grounded = state.is_grounded
+        self.wall_contact = state.wall_contact
+        self.flipped = state.flipped
+        self.score = state.score
+
+    def update(self, dt: float = 0):
+        hud = self.level.game.hud
+        if hud is None:
+            return
 
-    def fixed_update(self, dt: float = 0, tiles=[]):
         # debug pos
-        self.hud.debug(
+        hud.debug(
             "pos",
             "\u0040",
             f"{self.rect.x:.1f} {self.rect.y:.1f} | {self.hit_rect.x:.1f} {self.hit_rect.y:.1f} ",
             (69, 92, 123),
         )
 
-        self.hud.debug(
+        hud.debug(
             "direction",
             "V",
             f"{self.velocity.x:.1f} {self.velocity.y:.1f}",
             (80, 150, 150),
         )
 
-        self.hud.debug(
+        hud.debug(
             "player_debug",
             "P",
             f"{self.is_grounded} {self.jump_counter}",
             (180, 124, 170),
         )
 
-        self.hud.debug(
+        hud.debug(
             "player_score",
             "S",
             f"{self.score}",
             (44, 197, 246),
         )
 
-    def animate(self):
-        is_running = self.velocity.x != 0
-        is_falling = not self.is_grounded and self.velocity.y > 0
-        is_ascending = not self.is_grounded and self.velocity.y < 0
-
-        if is_running:
-            self.animation_sprite = self.sprites["run"]
-        else:
-            self.animation_sprite = self.sprites["idle"]
+    @profiler.profile("player.physics")
+    def fixed_update(
+        self,
+        dt: float = 0,
+        walls: TileGrid | None = None,
+        collectibles: EntityStore | None = None,
+    ):
+        self.old_rect.update(self.hit_rect)
 
-        if is_falling:
-            self.animation_sprite = self.sprites["fall"]
-        elif is_ascending:
-            if self.jump_counter > 1:
-                self.animation_sprite = self.sprites["double_jump"]
-            else:
-                self.animation_sprite = self.sprites["jump"]
+        self.move(dt)
 
-        if self.level.game.now - self.last_frame_at > self.frame_interval:
-            self.current_frame += 1
-            self.last_frame_at = self.level.game.now
+        if walls is not None:
+            self.collide(walls)
+        if collectibles is not None:
+            self.collide_collectibles(collectibles)
 
-        if self.current_frame + 1 > self.animation_sprite.get_width() / self.rect.w:
-            self.current_frame = 0
+        self.hit_rect.y = int(self.hit_rect.y)
+        self.rect.topleft = (
+            self.hit_rect.x - 6,
+            self.hit_rect.y - 8,
+        )  # adjust based on rect inflation
 
-        self.image = self.animation_sprite.subsurface(
-            pg.Rect(self.current_frame * self.rect.w, 0, self.rect.w, self.rect.h)
+    def interpolate(self, alpha: float):
+        """Place `render_rect` between the last two physics ticks"""
+        self.render_rect.topleft = (
+            self.old_rect.x + (self.hit_rect.x - self.old_rect.x) * alpha - 6,
+            self.old_rect.y + (self.hit_rect.y - self.old_rect.y) * alpha - 8,
         )
-        self.image = (
-            pg.transform.flip(self.image, True, False) if self.flipped else self.image
-        )
-        self.mask = pg.mask.from_surface(self.image)
 
-    def draw(self, target: pg.Surface, scroll: vector):
+    def pose(self) -> str:
+        """Name of the animation for the current physics state"""
+        if not self.is_grounded and self.velocity.y > 0:
+            return "fall"
+        if not self.is_grounded and self.velocity.y < 0:
+            return "double_jump" if self.jump_counter > 1 else "jump"
+        return "run" if self.velocity.x != 0 else "idle"
+
+    def pose_mask(self) -> pg.mask.Mask:
+        """Mask of the frame shown at this tick, from physics state and tick count
+
+        Nothing drawn feeds into it, so pickups don't depend on frame rate and
+        replays and headless simulations collect the same as the game.
+        """
+        unflipped, flipped = load_masks(self.sprite_path(self.pose()), self.frame_size)
+        time = self.level.ticks * self.level.game.fixed_dt
+        frame = int(time / self.level.animation_clock.frame_interval)
+        return (flipped if self.flipped else unflipped)[frame % len(unflipped)]
+
+    def animate(self):
+        self.animation = self.sprite(self.pose())
+        frame = self.level.animation_clock.frame(self.animation)
+        self.image = self.animation.frame(frame, self.flipped)
+
+    def draw(
+        self, target: pg.Surface, scroll: vector, dirty: list[pg.Rect] | None = None
+    ):
+        """Draw, adding every rect touched to `dirty` if given"""
         self.animate()
 
-        target.blit(self.image, (display_width - self.rect.w, 0))
-        target.blit(self.image, apply_scroll(self.rect, scroll))
+        preview = target.blit(self.image, (display_width - self.rect.w, 0))
+        sprite = target.blit(
+            self.image, apply_scroll(self.render_rect, scroll, out=self.screen_position)
+        )
+        if dirty is not None:
+            dirty += (preview, sprite)
 
         # draw outline
         # pg.draw.lines(
@@ -239,14 +336,22 @@ class Player(Sprite):
         #         False,
         #         [
         #             (x + self.rect.x - scroll.x, y + self.rect.y - scroll.y)
-        #             for x, y in self.mask.outline(every=1)
+        #             for x, y in self.pose_mask().outline(every=1)
         #         ],
         #     )
 
         if self.debug:
-            pg.draw.rect(
-                target, Color.GREEN, apply_scroll(self.hit_rect, scroll, "rect"), 1
+            hit = pg.draw.rect(
+                target,
+                Color.GREEN,
+                apply_scroll(self.hit_rect, scroll, "rect", self.screen_rect),
+                1,
             )
-            pg.draw.rect(
-                target, Color.RED, apply_scroll(self.old_rect, scroll, "rect"), 1
+            old = pg.draw.rect(
+                target,
+                Color.RED,
+                apply_scroll(self.old_rect, scroll, "rect", self.screen_rect),
+                1,
             )
+            if dirty is not None:
+                dirty += (hit, old)
@@ -0,0 +1,219 @@
+from .settings import *
+
+
+def integer_rect(window_size: tuple[int, int], target_size: tuple[int, int]) -> pg.Rect:
+    """Largest whole-multiple scale of `target_size` centered in the window"""
+    scale = max(
+        min(window_size[0] // target_size[0], window_size[1] // target_size[1]), 1
+    )
+    rect = pg.Rect(0, 0, target_size[0] * scale, target_size[1] * scale)
+    rect.center = (window_size[0] // 2, window_size[1] // 2)
+    return rect
+
+
+class ScalePresenter:
+    """Stretches the target over the whole window surface with `transform.scale`
+
+    `present` and `flip` take the target / window rects that changed, backends
+    that can't present part of the target ignore them and present everything.
+    """
+
+    name = "scale"
+
+    def __init__(
+        self,
+        window_size: tuple[int, int],
+        target_size: tuple[int, int],
+        vsync: bool = False,
+    ) -> None:
+        self.window_size = window_size
+        self.window = pg.display.set_mode(window_size, vsync=vsync)
+
+    def set_caption(self, caption: str):
+        pg.display.set_caption(caption)
+
+    def present(
+        self, target: pg.Surface, rects: list[pg.Rect] | None = None
+    ) -> list[pg.Rect] | None:
+        """Returns the window rects presented, None for all of it"""
+        pg.transform.scale(target, self.window_size, self.window)
+
+    def overlay(self) -> pg.Surface:
+        """Surface the Hud draws on, at the window's resolution"""
+        return self.window
+
+    def overlay_drawn(self, rects: list[pg.Rect]):
+        """Window rects the Hud drew over, re-presented by the next partial `present`"""
+
+    def flip(self, rects: list[pg.Rect] | None = None):
+        pg.display.update()
+
+
+class IntegerPresenter(ScalePresenter):
+    """Whole-multiple `scale_by` straight into a reused window subsurface
+
+    The window is letterboxed when it is not an exact multiple of the target.
+    """
+
+    name = "integer"
+
+    def __init__(
+        self,
+        window_size: tuple[int, int],
+        target_size: tuple[int, int],
+        vsync: bool = False,
+    ) -> None:
+        super().__init__(window_size, target_size, vsync)
+        self.rect = integer_rect(window_size, target_size)
+        self.scale = self.rect.w // target_size[0]
+        self.area = self.window.subsurface(self.rect)
+
+        # letterbox bars, cleared only after the Hud may have drawn over them
+        self.overlay_used = False
+        self.overlay_rects: list[pg.Rect] = []
+        w, h = window_size
+        self.bars = [
+            bar
+            for bar in (
+                pg.Rect(0, 0, w, self.rect.top),
+                pg.Rect(0, self.rect.bottom, w, h - self.rect.bottom),
+                pg.Rect(0, self.rect.top, self.rect.left, self.rect.h),
+                pg.Rect(
+                    self.rect.right, self.rect.top, w - self.rect.right, self.rect.h
+                ),
+            )
+            if bar.w > 0 and bar.h > 0
+        ]
+
+    def present(
+        self, target: pg.Surface, rects: list[pg.Rect] | None = None
+    ) -> list[pg.Rect] | None:
+        if rects is None:
+            pg.transform.scale_by(target, self.scale, self.area)
+            presented = None
+        else:
+            # what the Hud covered last frame comes back from the target
+            scale = self.scale
+            ox, oy = self.rect.topleft
+            rects = list(rects)
+            for rect in self.overlay_rects:
+                left, top = (rect.left - ox) // scale, (rect.top - oy) // scale
+                right, bottom = (
+                    -(-(rect.right - ox) // scale),
+                    -(-(rect.bottom - oy) // scale),
+                )
+                rects.append(pg.Rect(left, top, right - left, bottom - top))
+
+            bounds = target.get_rect()
+            presented = []
+            for rect in rects:
+                rect = rect.clip(bounds)
+                if not rect.w or not rect.h:
+                    continue
+                scaled = pg.Rect(
+                    rect.x * scale, rect.y * scale, rect.w * scale, rect.h * scale
+                )
+                pg.transform.scale_by(
+                    target.subsurface(rect), scale, self.area.subsurface(scaled)
+                )
+                presented.append(scaled.move(self.rect.topleft))
+        self.overlay_rects = []
+
+        if self.overlay_used:
+            for bar in self.bars:
+                self.window.fill((0, 0, 0), bar)
+            if presented is not None:
+                presented += self.bars
+            self.overlay_used = False
+        return presented
+
+    def overlay(self) -> pg.Surface:
+        self.overlay_used = True
+        return self.window
+
+    def overlay_drawn(self, rects: list[pg.Rect]):
+        self.overlay_rects = rects
+
+    def flip(self, rects: list[pg.Rect] | None = None):
+        if rects is None:
+            pg.display.update()
+        elif rects:
+            pg.display.update(rects)
+
+
+class RendererPresenter:
+    """SDL renderer backend, the scale happens in `Renderer.blit`
+
+    The target is uploaded to a streaming texture each frame and drawn at a
+    whole-multiple size. The Hud draws onto its own window-sized overlay,
+    uploaded and blended on top at native resolution only on frames it is used.
+    """
+
+    name = "renderer"
+
+    def __init__(
+        self,
+        window_size: tuple[int, int],
+        target_size: tuple[int, int],
+        vsync: bool = False,
+    ) -> None:
+        from pygame._sdl2.video import Renderer, Texture, Window
+
+        # convert()/convert_alpha() take their pixel format from the display
+        # module window, which can't also have a renderer, so it gets a hidden one
+        pg.display.set_mode((1, 1), pg.HIDDEN)
+        self.window = Window(size=window_size)
+        self.renderer = Renderer(self.window, vsync=vsync)
+        self.rect = integer_rect(window_size, target_size)
+
+        self.texture = Texture(self.renderer, target_size, streaming=True)
+        self.overlay_surface = pg.Surface(window_size, pg.SRCALPHA)
+        self.overlay_texture = Texture(self.renderer, window_size, streaming=True)
+        self.overlay_texture.blend_mode = pg.BLENDMODE_BLEND
+        self.overlay_used = False
+
+    def set_caption(self, caption: str):
+        self.window.title = caption
+
+    def present(
+        self, target: pg.Surface, rects: list[pg.Rect] | None = None
+    ) -> list[pg.Rect] | None:
+        self.texture.update(target)
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+        self.renderer.blit(self.texture, self.rect)
+
+    def overlay(self) -> pg.Surface:
+        self.overlay_surface.fill((0, 0, 0, 0))
+        self.overlay_used = True
+        return self.overlay_surface
+
+    def overlay_drawn(self, rects: list[pg.Rect]):
+        pass
+
+    def flip(self, rects: list[pg.Rect] | None = None):
+        if self.overlay_used:
+            self.overlay_texture.update(self.overlay_surface)
+            self.renderer.blit(self.overlay_texture)
+            self.overlay_used = False
+        self.renderer.present()
+
+
+PRESENTERS = {
+    presenter.name: presenter
+    for presenter in (ScalePresenter, IntegerPresenter, RendererPresenter)
+}
+
+
+def create_presenter(
+    name: str,
+    window_size: tuple[int, int],
+    target_size: tuple[int, int],
+    vsync: bool = False,
+):
+    presenter = PRESENTERS.get(name)
+    if presenter is None:
+        raise ValueError(
+            f"unknown present backend {name!r}, expected one of {list(PRESENTERS)}"
+        )
+    return presenter(window_size, target_size, vsync)
@@ -0,0 +1,161 @@
+import contextlib
+import functools
+import time
+
+import numpy as np
+
+from .settings import *
+
+
+class RingBuffer:
+    """Fixed-size history backed by one preallocated array, oldest row first"""
+
+    def __init__(
+        self, capacity: int, columns: int | None = None, dtype=np.float64
+    ) -> None:
+        shape = (capacity,) if columns is None else (capacity, columns)
+        self.data = np.zeros(shape, dtype)
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.advance()
+
+    def advance(self):
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    @property
+    def current(self):
+        """The row that the next `advance` commits"""
+        return self.data[self.index]
+
+    def last(self, n: int = 1) -> np.ndarray:
+        n = min(n, self.count)
+        return np.take(
+            self.data, range(self.index - n, self.index), axis=0, mode="wrap"
+        )
+
+    def ordered(self) -> np.ndarray:
+        return self.last(self.count)
+
+    def mean(self, n: int | None = None):
+        if not self.count:
+            return np.zeros(self.data.shape[1:])
+        return self.last(n or self.count).mean(axis=0)
+
+
+class Span:
+    __slots__ = ("column", "profiler", "start")
+
+    def __init__(self, profiler: "Profiler", column: int) -> None:
+        self.profiler = profiler
+        self.column = column
+        self.start = 0
+
+    def __enter__(self):
+        self.profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.history.current[self.column] += time.perf_counter() - self.start
+        self.profiler.depth -= 1
+
+
+NULL_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """Named timing spans recorded per frame into a ring buffer
+
+    Column 0 is the whole frame, span columns are allocated on first use.
+    While disabled `span` hands back a shared no-op context manager.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings["profiler"]["enabled"],
+        capacity: int = settings["profiler"]["capacity"],
+        max_spans: int = settings["profiler"]["max_spans"],
+    ) -> None:
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.history = RingBuffer(capacity, max_spans + 1)
+
+        self.names: list[str] = []
+        self.depths: list[int] = []
+        self.spans: dict[str, Span] = {}
+        self.depth = 0
+        self.frame_start = time.perf_counter()
+
+    def span(self, name: str) -> Span | contextlib.nullcontext:
+        if not self.enabled:
+            return NULL_SPAN
+
+        span = self.spans.get(name)
+        if span is None:
+            if len(self.names) == self.max_spans:
+                return NULL_SPAN
+            self.names.append(name)
+            self.depths.append(self.depth)
+            span = self.spans[name] = Span(self, len(self.names))
+        return span
+
+    def profile(self, name: str):
+        """Decorator version of `span`"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def end_frame(self):
+        now = time.perf_counter()
+        if self.enabled:
+            self.history.current[0] = now - self.frame_start
+            self.history.advance()
+            self.history.current[:] = 0
+        self.frame_start = now
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    @property
+    def top_level(self) -> list[int]:
+        """Columns of spans that do not nest inside another span"""
+        return [i + 1 for i, depth in enumerate(self.depths) if depth == 0]
+
+    def last_frame(self) -> np.ndarray:
+        return self.history.last(1)[0] if len(self.history) else self.history.current
+
+    def export(self, path: str):
+        """Dump the recorded frames, `.npy` keeps full precision, otherwise CSV in ms"""
+        frames = self.history.ordered()[:, : len(self.names) + 1]
+        if path.endswith(".npy"):
+            np.save(path, frames)
+            return
+
+        np.savetxt(
+            path,
+            frames * 1000,
+            fmt="%.4f",
+            delimiter=",",
+            header=",".join(["frame", *self.names]),
+            comments="",
+        )
+
+
+profiler = Profiler()
@@ -0,0 +1,145 @@
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from .settings import *
+from .input import InputState
+
+MAGIC = b"PGSR"
+VERSION = 1
+
+# magic, version, tick rate, seed, level name length
+HEADER = struct.Struct("<4sBHQH")
+# tick count, final hit rect position and score
+FOOTER = struct.Struct("<IddI")
+
+LEFT, RIGHT, JUMP, DEBUG, RETRY = 1, 2, 4, 8, 16
+
+
+def pack(state: InputState) -> int:
+    return (
+        state.left * LEFT
+        | state.right * RIGHT
+        | state.jump * JUMP
+        | state.debug * DEBUG
+        | state.retry * RETRY
+    )
+
+
+def unpack(flags: int) -> InputState:
+    return InputState(
+        bool(flags & LEFT),
+        bool(flags & RIGHT),
+        bool(flags & JUMP),
+        bool(flags & DEBUG),
+        bool(flags & RETRY),
+    )
+
+
+class Recording:
+    """Input state of every fixed tick, one byte each, zlib compressed on disk
+
+    Held keys are sampled from the last frame before the tick, presses (jump,
+    debug, retry) are kept until a tick consumes them, matching what `Player` sees.
+    """
+
+    def __init__(
+        self,
+        level: str,
+        seed: int,
+        tick_rate: int = settings["physics"]["tick_rate"],
+    ) -> None:
+        self.level = level
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.inputs = bytearray()
+        self.pending = 0
+
+        self.x = self.y = 0.0
+        self.score = 0
+
+    def capture(self, state: InputState):
+        """Call once per frame with the state read from the input source"""
+        self.pending = pack(state) | (self.pending & (JUMP | DEBUG | RETRY))
+
+    def tick(self):
+        self.inputs.append(self.pending)
+        self.pending &= LEFT | RIGHT
+
+    def states(self) -> Iterator[InputState]:
+        states = [unpack(flags) for flags in range(32)]
+        return (states[flags] for flags in self.inputs)
+
+    def finish(self, player):
+        self.x, self.y = player.hit_rect.topleft
+        self.score = player.score
+
+    def save(self, path: str):
+        name = self.level.encode()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.tick_rate, self.seed, len(name)))
+            f.write(name)
+            f.write(FOOTER.pack(len(self.inputs), self.x, self.y, self.score))
+            f.write(zlib.compress(bytes(self.inputs), 9))
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, version, tick_rate, seed, length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} recording")
+        offset = HEADER.size
+        level = data[offset : offset + length].decode()
+        offset += length
+        ticks, x, y, score = FOOTER.unpack_from(data, offset)
+
+        recording = cls(level, seed, tick_rate)
+        recording.inputs = bytearray(zlib.decompress(data[offset + FOOTER.size :]))
+        if len(recording.inputs) != ticks:
+            raise ValueError(
+                f"{path}: expected {ticks} ticks, got {len(recording.inputs)}"
+            )
+        recording.x, recording.y, recording.score = x, y, score
+        return recording
+
+
+class ReplayResult(NamedTuple):
+    ticks: int
+    seconds: float
+    expected: tuple[float, float, int]
+    actual: tuple[float, float, int]
+
+    @property
+    def ok(self) -> bool:
+        return self.expected == self.actual
+
+
+def replay(path: str) -> ReplayResult:
+    """Run a recording's ticks back to back, without rendering or a frame cap"""
+    from .simulation import Simulation
+
+    recording = Recording.load(path)
+    if recording.tick_rate != settings["physics"]["tick_rate"]:
+        raise ValueError(
+            f"{path}: recorded at {recording.tick_rate} ticks/s, "
+            f"running at {settings['physics']['tick_rate']}"
+        )
+
+    simulation = Simulation(recording.level, recording.seed)
+
+    start = time.perf_counter()
+    for state in recording.states():
+        simulation.step(state)
+    seconds = time.perf_counter() - start
+
+    player = simulation.level.player
+    return ReplayResult(
+        len(recording.inputs),
+        seconds,
+        (recording.x, recording.y, recording.score),
+        (player.hit_rect.x, player.hit_rect.y, player.score),
+    )
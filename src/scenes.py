@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import Future
+
+from .settings import *
+from .assets import assets
+from .levels.cache import level_path
+from .levels.level import Level
+from .levels.dev_level import DevLevel
+
+LEVELS = {"dev": DevLevel}
+
+
+class SceneManager:
+    """Holds the active level and builds the next one while it plays
+
+    `preload` compiles the TMX (or maps its cache) and decodes the tileset on
+    the asset workers. Once those are done, `update` runs the level's
+    `load_steps` on the main thread, starting no new step once `budget`
+    seconds of the frame are spent. Steps are kept to a fraction of it
+    whatever the map size. A level asked for with `goto` replaces the active
+    one on the first frame it is ready, which is only swapping a reference.
+    """
+
+    def __init__(self, game, budget: float = settings["scenes"]["budget"]) -> None:
+        from .main import Game
+
+        self.game: Game = game
+        self.budget = budget
+
+        self.level: Level | None = None
+        self.next: Level | None = None
+        self.next_name: str | None = None
+        self.futures: list[Future] = []
+        self.switch_pending = False
+
+    def create(self, name: str, staged: bool = False) -> Level:
+        level = LEVELS.get(name)
+        if level is not None:
+            return level(self.game, staged=staged)
+        return Level(self.game, name, staged=staged)
+
+    def load(self, name: str) -> Level:
+        """Build `name` on the spot and make it active, for the first level"""
+        self.activate(self.create(name))
+        return self.level
+
+    def preload(self, name: str):
+        if name == self.next_name:
+            return
+        self.cancel()
+        self.next_name = name
+        # player sheets are shared between levels and already cached
+        self.futures = assets.preload(level_path(name))
+
+    def goto(self, name: str):
+        """Switch to `name` as soon as it has finished loading"""
+        self.preload(name)
+        self.switch_pending = True
+
+    def cancel(self):
+        if self.next is not None:
+            self.next.close()
+        self.next = None
+        self.next_name = None
+        self.futures = []
+        self.switch_pending = False
+
+    @property
+    def ready(self) -> bool:
+        return self.next is not None and self.next.loaded
+
+    def update(self):
+        """Build the preloaded level until `budget` seconds are spent"""
+        if self.next_name is None or self.ready:
+            return
+        if not all(future.done() for future in self.futures):
+            return
+
+        if self.next is None:
+            # creating it is this frame's share
+            self.next = self.create(self.next_name, staged=True)
+            return
+        start = time.perf_counter()
+        for _ in self.next.loading:
+            if time.perf_counter() - start > self.budget:
+                return
+
+    def switch(self) -> bool:
+        """Make the preloaded level active if it is ready"""
+        if not self.ready:
+            return False
+        level = self.next
+        self.next = None
+        self.next_name = None
+        self.futures = []
+        self.switch_pending = False
+        self.activate(level)
+        return True
+
+    def activate(self, level: Level):
+        previous = self.level
+        if previous is not None:
+            # replays start from one level, end the recording where it leaves it
+            self.game.stop_recording()
+        self.level = self.game.level = level
+        if self.game.dirty is not None:
+            self.game.dirty.invalidate()
+        if previous is not None:
+            previous.close()
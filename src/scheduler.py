@@ -0,0 +1,141 @@
+import time
+from collections.abc import Callable
+
+from .settings import *
+
+
+class Task:
+    __slots__ = ("args", "fn", "max_wait", "name", "priority", "submitted")
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        args: tuple,
+        priority: int,
+        max_wait: int,
+        submitted: int,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.max_wait = max_wait
+        self.submitted = submitted
+
+
+class TaskStats:
+    __slots__ = ("cost", "deferred", "dropped", "forced", "ran")
+
+    def __init__(self) -> None:
+        self.ran = 0
+        self.deferred = 0  # frames spent waiting for budget
+        self.dropped = 0  # replaced by a newer submission before running
+        self.forced = 0  # ran over budget after waiting `max_wait` frames
+        self.cost = 0.0  # moving average, seconds
+
+
+class FrameScheduler:
+    """Runs deferrable work in whatever the frame budget has left
+
+    Must-run work (input, physics, world draw) happens before `run`. Tasks are
+    keyed by name and only the latest submission of a name is kept, so stale
+    Hud refreshes are dropped rather than queued. Pending tasks run highest
+    priority first while their measured cost fits the remaining budget; one
+    that has waited `max_wait` frames runs regardless.
+    """
+
+    def __init__(
+        self,
+        reserve: float = settings["scheduler"]["reserve"],
+        max_wait: int = settings["scheduler"]["max_wait"],
+    ) -> None:
+        self.reserve = reserve
+        self.max_wait = max_wait
+
+        self.budget = math.inf
+        self.frame_start = time.perf_counter()
+        self.frame = 0
+
+        self.tasks: dict[str, Task] = {}
+        self.spare: dict[str, Task] = {}  # ran tasks, reused by the next submit
+        self.stats: dict[str, TaskStats] = {}
+
+    def begin_frame(self, target_fps: float):
+        self.frame_start = time.perf_counter()
+        self.frame += 1
+        # a fraction of the frame is kept back for the Hud draw and flip
+        self.budget = (1 - self.reserve) / target_fps if target_fps else math.inf
+
+    def remaining(self) -> float:
+        return self.budget - (time.perf_counter() - self.frame_start)
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable,
+        *args,
+        priority: int = 0,
+        max_wait: int | None = None,
+    ):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = TaskStats()
+
+        max_wait = self.max_wait if max_wait is None else max_wait
+        task = self.tasks.get(name)
+        if task is None:
+            task = self.spare.pop(name, None)
+            if task is None:
+                task = Task(name, fn, args, priority, max_wait, self.frame)
+            else:
+                task.fn = fn
+                task.args = args
+                task.priority = priority
+                task.max_wait = max_wait
+                task.submitted = self.frame
+            self.tasks[name] = task
+            return
+
+        # keep the original submission frame so resubmitting can't starve it
+        stats.dropped += 1
+        task.fn = fn
+        task.args = args
+        task.priority = priority
+
+    def run(self):
+        if not self.tasks:
+            return
+
+        order = sorted(
+            self.tasks.values(), key=lambda task: (-task.priority, task.submitted)
+        )
+        for task in order:
+            stats = self.stats[task.name]
+            over = stats.cost > self.remaining()
+            if over and self.frame - task.submitted < task.max_wait:
+                stats.deferred += 1
+                continue
+
+            start = time.perf_counter()
+            task.fn(*task.args)
+            cost = time.perf_counter() - start
+
+            del self.tasks[task.name]
+            self.spare[task.name] = task
+            stats.ran += 1
+            stats.forced += over
+            stats.cost = cost if not stats.cost else stats.cost * 0.9 + cost * 0.1
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                "ran": stats.ran,
+                "deferred": stats.deferred,
+                "dropped": stats.dropped,
+                "forced": stats.forced,
+                "cost_ms": stats.cost * 1e3,
+                "pending": name in self.tasks,
+            }
+            for name, stats in self.stats.items()
+        }
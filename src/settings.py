@@ -4,11 +4,54 @@ import pygame as pg
 from pygame.math import Vector2 as vector
 
 settings = {
-    "display": {"target_fps": 165, "width": 1280, "height": 720},
+    "display": {
+        "target_fps": 165,
+        "width": 1280,
+        "height": 720,
+        "present": "integer",  # scale, integer or renderer, see present.py
+        # redraw only what changed while the camera is still, see dirty.py
+        "dirty_rects": False,
+        "dirty_max_coverage": 0.5,  # of the target, beyond it a full redraw is cheaper
+    },
     "camera": {"smoothness": 180},
+    "physics": {
+        "tick_rate": 50,
+        "max_ticks_per_frame": 5,
+        # collectibles against the current animation frame instead of the hit rect
+        "pixel_perfect": False,
+    },
+    "render": {
+        "chunk_size": 256,
+        "chunk_budget": 16 * 1024 * 1024,  # bytes
+        "chunk_idle_frames": 600,
+    },
+    "streaming": {
+        "enabled": False,  # always on for levels of at least min_tiles
+        "min_tiles": 1_000_000,
+        "radius": 1,  # chunks
+        "ahead": 2,  # chunks
+        "budget": 32 * 1024 * 1024,  # bytes
+    },
+    "particles": {"capacity": 65536},
+    "scenes": {"budget": 0.002},  # seconds a frame building a level, between steps
+    "snapshots": {
+        "capacity": 64,  # checkpoints kept for rewinding
+        "interval": 50,  # ticks between checkpoints, taken while grounded
+    },
+    "scheduler": {
+        "reserve": 0.25,  # of the frame budget, left for the Hud draw and flip
+        "max_wait": 30,  # frames a deferred task can wait before it runs anyway
+    },
+    "assets": {"budget": 64 * 1024 * 1024, "workers": 2},  # bytes
+    "profiler": {"enabled": False, "capacity": 1024, "max_spans": 16},
     "keybinds": {
         "movements": {"jump": " ", "right": "d", "left": "a"},
-        "misc": {"debug": pg.K_F3},
+        "misc": {
+            "debug": pg.K_F3,
+            "profiler": pg.K_F4,
+            "export": pg.K_F5,
+            "retry": pg.K_r,
+        },
     },
 }
 
@@ -16,7 +59,7 @@ display_size = display_width, display_height = 320, 180
 
 DEV = True
 DRAW_RECTS = DEV
-TILE_SIZE = 16
+TILE_SIZE = 18
 
 
 class Color:
@@ -0,0 +1,147 @@
+import random
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from .settings import *
+from .input import InputState
+from .levels.level import Level
+
+Script = Callable[[int], InputState]
+
+
+class Simulation:
+    """Just enough of `Game` for a `Level` to tick its physics
+
+    No window, Hud, walls or sprites are created, so it runs anywhere pygame
+    imports, including worker processes.
+    """
+
+    def __init__(self, level: str, seed: int = 0) -> None:
+        self.seed = seed
+        random.seed(seed)
+
+        self.hud = None
+        self.show_hud = False
+        self.dirty = None
+        self.now = 0
+        self.dt = 0
+        self.alpha = 0
+        self.fixed_dt = 1 / settings["physics"]["tick_rate"]
+        self.sim_time = 0
+        self.ticks = 0
+        self.input_state = InputState()
+
+        self.level = Level(self, level, render=False)
+
+    def fixed_update(self):
+        self.level.fixed_update(self.fixed_dt)
+        self.sim_time += self.fixed_dt
+        self.ticks += 1
+
+    def step(self, state: InputState):
+        """One tick with `state` as the player's input"""
+        self.input_state = state
+        self.level.handle_events([])
+        self.fixed_update()
+
+
+# input scripts, module level so jobs pickle by reference
+
+
+def idle(tick: int) -> InputState:
+    return InputState()
+
+
+def walk_and_jump(tick: int) -> InputState:
+    """Run back and forth, jumping every second, 5 seconds each way"""
+    right = tick // 250 % 2 == 0
+    return InputState(left=not right, right=right, jump=tick % 50 == 0)
+
+
+class RandomInput:
+    """Holds a random direction for a while and jumps now and then"""
+
+    def __init__(
+        self, seed: int = 0, hold: int = 40, jump_chance: float = 0.05
+    ) -> None:
+        self.seed = seed
+        self.hold = hold
+        self.jump_chance = jump_chance
+
+    def __repr__(self) -> str:
+        return f"random({self.seed})"
+
+    def __call__(self, tick: int) -> InputState:
+        rng = random.Random(self.seed * 1_000_003 + tick // self.hold)
+        direction = rng.randrange(3)
+        jump = random.Random(self.seed * 1_000_003 - tick).random() < self.jump_chance
+        return InputState(left=direction == 1, right=direction == 2, jump=jump)
+
+
+class Job(NamedTuple):
+    level: str
+    script: Script
+    ticks: int
+    seed: int = 0
+
+
+class JobResult(NamedTuple):
+    level: str
+    script: str
+    ticks: int
+    seconds: float
+    x: float
+    y: float
+    score: int
+    collected: int
+    collectibles: int
+    longest_stuck: int  # ticks pushing sideways without moving
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / max(self.seconds, 1e-9)
+
+
+def run_job(job: Job) -> JobResult:
+    simulation = Simulation(job.level, job.seed)
+    level = simulation.level
+    player = level.player
+    total = len(level.collectibles)
+
+    stuck = longest_stuck = 0
+    start = time.perf_counter()
+    for tick in range(job.ticks):
+        state = job.script(tick)
+        x = player.hit_rect.x
+        simulation.step(state)
+
+        if state.left != state.right and player.hit_rect.x == x:
+            stuck += 1
+            longest_stuck = max(longest_stuck, stuck)
+        else:
+            stuck = 0
+    seconds = time.perf_counter() - start
+
+    return JobResult(
+        job.level,
+        getattr(job.script, "__name__", repr(job.script)),
+        job.ticks,
+        seconds,
+        player.hit_rect.x,
+        player.hit_rect.y,
+        player.score,
+        total - len(level.collectibles),
+        total,
+        longest_stuck,
+    )
+
+
+def run_jobs(jobs: Iterable[Job], workers: int | None = None) -> list[JobResult]:
+    """Run every job in its own `Simulation`, spread over `workers` processes"""
+    jobs = list(jobs)
+    if workers == 1:
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(run_job, jobs))
@@ -6,11 +6,13 @@ class Sprite(pg.sprite.Sprite):
     def __init__(
         self,
         position: vector,
-        surface: pg.Surface = pg.Surface((TILE_SIZE, TILE_SIZE)),
+        surface: pg.Surface | None = None,
         *groups,
     ) -> None:
         super().__init__(groups)
 
-        self.image = surface
+        self.image = (
+            surface if surface is not None else pg.Surface((TILE_SIZE, TILE_SIZE))
+        )
         self.rect = self.image.get_frect(topleft=position)
         self.old_rect = self.rect.copy()
@@ -1,2 +1 @@
-from .wall import Wall
-from .collectible import Collectible
+from .layer import SortedTiles, TileLayer, sort_tiles
@@ -0,0 +1,135 @@
+from collections.abc import Callable
+from typing import NamedTuple
+
+import numpy as np
+
+from ..settings import *
+
+
+class SortedTiles(NamedTuple):
+    """Tiles sorted by bucket, and the bx, by, start, stop run of every bucket"""
+
+    x: np.ndarray
+    y: np.ndarray
+    gid: np.ndarray
+    buckets: np.ndarray
+
+
+def sort_tiles(
+    gids: np.ndarray, tile_size: tuple[int, int], bucket_size: int
+) -> SortedTiles:
+    rows, columns = np.nonzero(gids)
+    tw, th = tile_size
+    bx = columns * tw // bucket_size
+    by = rows * th // bucket_size
+    # nonzero is row-major already, a stable sort on the bucket keeps it so
+    order = np.argsort(by * (int(bx.max(initial=0)) + 1) + bx, kind="stable")
+    rows, columns, bx, by = rows[order], columns[order], bx[order], by[order]
+
+    # contiguous run of every bucket in the sorted arrays
+    starts = np.flatnonzero(
+        (np.diff(bx, prepend=-1) != 0) | (np.diff(by, prepend=-1) != 0)
+    )
+    stops = np.append(starts[1:], len(order))
+    return SortedTiles(
+        columns.astype(np.int32),
+        rows.astype(np.int32),
+        np.asarray(gids[rows, columns], np.int32),
+        np.column_stack((bx[starts], by[starts], starts, stops)).astype(np.int32),
+    )
+
+
+class TileLayer:
+    """Static tiles as parallel grid x, grid y and gid arrays
+
+    Nothing exists per tile beyond three array entries. Tiles are sorted into
+    `bucket_size` pixel buckets by their top-left corner so a query only looks
+    at the buckets under it, found in a dense grid of runs, and are drawn with
+    area blits out of the level's one tileset atlas rather than a surface per
+    gid. `tiles` skips the sorting, for layers read back from the level cache.
+    """
+
+    def __init__(
+        self,
+        gids: np.ndarray,
+        tile_size: tuple[int, int],
+        atlas: pg.Surface,
+        atlas_rect: Callable[[int], pg.Rect],
+        bucket_size: int = settings["render"]["chunk_size"],
+        tiles: SortedTiles | None = None,
+    ) -> None:
+        self.tile_size = tile_size
+        self.atlas = atlas
+        self.atlas_rect = atlas_rect
+        self.atlas_rects: dict[int, pg.Rect] = {}
+        self.bucket_size = bucket_size
+
+        if tiles is None:
+            tiles = sort_tiles(gids, tile_size, bucket_size)
+        self.x, self.y, self.gid = tiles.x, tiles.y, tiles.gid
+
+        # start, stop of every bucket's run, empty buckets are 0, 0
+        tw, th = tile_size
+        rows, columns = gids.shape
+        self.runs = np.zeros(
+            (-(-rows * th // bucket_size), -(-columns * tw // bucket_size), 2), np.int32
+        )
+        bx, by, starts, stops = tiles.buckets.T
+        self.runs[by, bx, 0] = starts
+        self.runs[by, bx, 1] = stops
+
+    def __len__(self) -> int:
+        return len(self.gid)
+
+    @property
+    def nbytes(self) -> int:
+        return self.x.nbytes + self.y.nbytes + self.gid.nbytes
+
+    def area(self, gid: int) -> pg.Rect:
+        area = self.atlas_rects.get(gid)
+        if area is None:
+            area = self.atlas_rects[gid] = self.atlas_rect(gid)
+        return area
+
+    def query(self, rect: pg.Rect | pg.FRect) -> np.ndarray:
+        """Indices of the tiles overlapping `rect`"""
+        size = self.bucket_size
+        tw, th = self.tile_size
+        # a tile reaches into the buckets right of / below its corner's
+        top = max(int((rect.top - th + 1) // size), 0)
+        left = max(int((rect.left - tw + 1) // size), 0)
+        bottom = max(int((rect.bottom - 1) // size) + 1, top)
+        right = max(int((rect.right - 1) // size) + 1, left)
+        runs = [
+            np.arange(start, stop)
+            for start, stop in self.runs[top:bottom, left:right].reshape(-1, 2).tolist()
+            if stop > start
+        ]
+        if not runs:
+            return np.zeros(0, np.intp)
+
+        index = np.concatenate(runs)
+        x = self.x[index] * tw
+        y = self.y[index] * th
+        inside = (
+            (x < rect.right)
+            & (x + tw > rect.left)
+            & (y < rect.bottom)
+            & (y + th > rect.top)
+        )
+        return index[inside]
+
+    def blits(
+        self, rect: pg.Rect | pg.FRect
+    ) -> list[tuple[pg.Surface, tuple[int, int], pg.Rect]]:
+        """`Surface.blits` sequence drawing the tiles under `rect`, relative to it"""
+        tw, th = self.tile_size
+        index = self.query(rect)
+        ox, oy = int(rect.left), int(rect.top)
+        atlas, area = self.atlas, self.area
+        return [
+            (atlas, (x * tw - ox, y * th - oy), area(gid))
+            for x, y, gid in zip(
+                self.x[index].tolist(), self.y[index].tolist(), self.gid[index].tolist()
+            )
+        ]
@@ -2,11 +2,19 @@ from .settings import *
 
 
 def apply_scroll(
-    rect: pg.Rect, scroll: vector, expects: str = "vector"
+    rect: pg.Rect,
+    scroll: vector,
+    expects: str = "vector",
+    out: vector | pg.Rect | None = None,
 ) -> vector | pg.Rect:
-    scrolled = vector(rect.x - scroll.x, rect.y - scroll.y)
-
+    """Screen position of `rect`, written into `out` if given instead of a new object"""
     if expects == "rect":
-        return pg.Rect(scrolled.x, scrolled.y, rect.w, rect.h)
+        if out is None:
+            out = pg.Rect(0, 0, 0, 0)
+        out.update(rect.x - scroll.x, rect.y - scroll.y, rect.w, rect.h)
+        return out
 
-    return scrolled
+    if out is None:
+        out = vector()
+    out.update(rect.x - scroll.x, rect.y - scroll.y)
+    return out